@@ -7,8 +7,30 @@ View evaluation logs in a web interface
 import json
 import os
 from datetime import datetime
-from flask import Flask, render_template_string, jsonify, request
-import glob
+from flask import Flask, Response, request
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import threading
+import time
+
+# Prefer orjson for parsing evaluation logs, fall back to stdlib json
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+    
+    def json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+# Rotated logs are zstd-compressed when zstandard is available
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 app = Flask(__name__)
 
@@ -70,36 +92,36 @@ DASHBOARD_HTML = """
         
         <div class="evaluations">
             <h2>📊 Recent Evaluations</h2>
-            {% for eval in evaluations %}
-            <div class="evaluation-item {{ 'success' if eval.metrics.success else 'error' }}">
+            {% for row in rows %}
+            <div class="evaluation-item {{ 'success' if row.success else 'error' }}">
                 <div class="evaluation-header">
-                    <span class="task-badge">{{ eval.task }}</span>
-                    <span>{{ eval.timestamp }}</span>
+                    <span class="task-badge">{{ row.task }}</span>
+                    <span>{{ row.timestamp }}</span>
                 </div>
                 <div class="metrics">
                     <div class="metric">
-                        <div class="metric-value">{{ "%.2f"|format(eval.metrics.execution_time_seconds) }}s</div>
+                        <div class="metric-value">{{ row.time_str }}s</div>
                         <div class="metric-label">Execution Time</div>
                     </div>
                     <div class="metric">
-                        <div class="metric-value">{{ "✅" if eval.metrics.success else "❌" }}</div>
+                        <div class="metric-value">{{ "✅" if row.success else "❌" }}</div>
                         <div class="metric-label">Success</div>
                     </div>
-                    {% if eval.metrics.itinerary_quality is defined %}
+                    {% if row.quality_str is not none %}
                     <div class="metric">
-                        <div class="metric-value">{{ "%.2f"|format(eval.metrics.itinerary_quality) }}</div>
+                        <div class="metric-value">{{ row.quality_str }}</div>
                         <div class="metric-label">Quality Score</div>
                     </div>
                     {% endif %}
-                    {% if eval.metrics.suggestion_count is defined %}
+                    {% if row.suggestions is not none %}
                     <div class="metric">
-                        <div class="metric-value">{{ eval.metrics.suggestion_count }}</div>
+                        <div class="metric-value">{{ row.suggestions }}</div>
                         <div class="metric-label">Suggestions</div>
                     </div>
                     {% endif %}
-                    {% if eval.metrics.item_count is defined %}
+                    {% if row.items is not none %}
                     <div class="metric">
-                        <div class="metric-value">{{ eval.metrics.item_count }}</div>
+                        <div class="metric-value">{{ row.items }}</div>
                         <div class="metric-label">Items</div>
                     </div>
                     {% endif %}
@@ -112,22 +134,222 @@ DASHBOARD_HTML = """
 </html>
 """
 
-def load_evaluations():
-    """Load evaluation data from JSONL files"""
-    evaluations = []
-    log_files = glob.glob("*.jsonl") + glob.glob("../*.jsonl")
+# Compile the dashboard template once, with the app's autoescaping environment
+DASHBOARD_TEMPLATE = app.jinja_env.from_string(DASHBOARD_HTML)
+
+# Read size for streaming JSONL files
+READ_CHUNK_SIZE = 128 * 1024
+
+def _open_log(log_file):
+    """Open a log file for binary reading, decompressing .zst archives"""
+    f = open(log_file, 'rb', buffering=0)
+    if log_file.endswith('.zst'):
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=True)
+    return f
+
+def read_jsonl_file(log_file, offset=0):
+    """Parse a JSONL file from a byte offset in fixed-size binary chunks.
     
-    for log_file in log_files:
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                for line in f:
+    Returns the parsed records and the offset just past the last complete
+    line, so callers can resume from there once more data is appended.
+    """
+    records = []
+    buf = bytearray()
+    consumed = offset
+    
+    with _open_log(log_file) as f:
+        if offset:
+            f.seek(offset)
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            buf += chunk
+            
+            start = 0
+            end = buf.find(b'\n', start)
+            while end != -1:
+                if end > start:
                     try:
-                        evaluation = json.loads(line.strip())
-                        evaluations.append(evaluation)
-                    except json.JSONDecodeError:
-                        continue
+                        records.append(json_loads(buf[start:end]))
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        pass
+                start = end + 1
+                end = buf.find(b'\n', start)
+            
+            # Keep the trailing partial line for the next chunk
+            consumed += start
+            del buf[:start]
     
-    return sorted(evaluations, key=lambda x: x.get('timestamp', ''), reverse=True)
+    # Last line may not be newline-terminated; only consume it if it parses,
+    # otherwise it is likely a write still in progress
+    if buf.strip():
+        try:
+            records.append(json_loads(buf))
+            consumed += len(buf)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            pass
+    
+    return records, consumed
+
+# Tail state per log file: path -> (inode, offset, records)
+_TAIL_STATE = {}
+
+# Per-file locks serializing tail reads; the threaded dev server may refresh a file concurrently
+_TAIL_LOCKS = {}
+
+# Merged view over all log files, rebuilt only when a file grows or rotates.
+# Derived values (sorted list, stats, rendered page, JSON bodies) are added
+# lazily to the generation they were computed from. A rebuild rebinds the name
+# to a new dict, so concurrent requests never see a half-built generation.
+_EVALUATIONS_CACHE = {'signature': None, 'evaluations': [], 'etag': None}
+
+# Upper bound on threads used to parse changed log files
+MAX_PARSE_WORKERS = 8
+
+def _is_log_current(log_file, st):
+    """Whether the tail state already covers the whole file"""
+    state = _TAIL_STATE.get(log_file)
+    return bool(state) and state[0] == st.st_ino and state[1] == st.st_size
+
+def _read_log_tail(log_file, st):
+    """Return all records in a log file, parsing only bytes appended since the last call"""
+    with _TAIL_LOCKS.setdefault(log_file, threading.Lock()):
+        state = _TAIL_STATE.get(log_file)
+        if state and state[0] == st.st_ino and st.st_size >= state[1]:
+            inode, offset, records = state
+            if st.st_size == offset:
+                return records
+        else:
+            # New or rotated/truncated file: start over
+            offset, records = 0, []
+        
+        # Build a new list; the published one may still be in use by another request
+        new_records, offset = read_jsonl_file(log_file, offset)
+        records = records + new_records
+        if log_file.endswith('.zst'):
+            # Archives are immutable; track them by compressed size
+            offset = st.st_size
+        _TAIL_STATE[log_file] = (st.st_ino, offset, records)
+        return records
+
+# Directories scanned for evaluation logs
+LOG_DIRS = (".", "..")
+
+# Seconds a directory listing is trusted before re-checking the directory mtime
+GLOB_CACHE_TTL = 1.0
+
+# Directory listing cache: dir -> (dir_mtime_ns, checked_at, [paths])
+_GLOB_CACHE = {}
+
+def _list_log_files(log_dir):
+    """List *.jsonl (and *.jsonl.zst) files in a directory, re-scanning only when it changes"""
+    now = time.monotonic()
+    cached = _GLOB_CACHE.get(log_dir)
+    if cached and now - cached[1] < GLOB_CACHE_TTL:
+        return cached[2]
+    
+    try:
+        dir_mtime = os.stat(log_dir).st_mtime_ns
+    except OSError:
+        _GLOB_CACHE.pop(log_dir, None)
+        return []
+    
+    if cached and cached[0] == dir_mtime:
+        paths = cached[2]
+    else:
+        with os.scandir(log_dir) as entries:
+            names = {entry.name for entry in entries if not entry.name.startswith(".")}
+        paths = sorted(
+            name if log_dir == "." else os.path.join(log_dir, name)
+            for name in names
+            if name.endswith(".jsonl") or (
+                # Skip archives whose plaintext is still present (compression in progress)
+                zstandard is not None and name.endswith(".jsonl.zst") and name[:-4] not in names
+            )
+        )
+    
+    _GLOB_CACHE[log_dir] = (dir_mtime, now, paths)
+    return paths
+
+# Number of evaluations shown on the dashboard page
+RECENT_EVALUATIONS_LIMIT = 50
+
+def _timestamp_key(evaluation):
+    """Sort key ordering evaluations by their ISO timestamp"""
+    return evaluation.get('timestamp', '')
+
+def _load_generation():
+    """Current evaluations generation, rebuilt from the JSONL files when they change"""
+    global _EVALUATIONS_CACHE
+    log_files = [path for log_dir in LOG_DIRS for path in _list_log_files(log_dir)]
+    signature = []
+    per_file = []
+    
+    file_stats = []
+    for log_file in log_files:
+        try:
+            file_stats.append((log_file, os.stat(log_file)))
+        except OSError:
+            continue
+    
+    # Parse changed files in parallel; file reads and JSON decoding release the GIL
+    changed = [item for item in file_stats if not _is_log_current(*item)]
+    if len(changed) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_PARSE_WORKERS, len(changed))) as executor:
+            list(executor.map(lambda item: _read_log_tail(*item), changed))
+    
+    for log_file, st in file_stats:
+        records = _read_log_tail(log_file, st)
+        signature.append((log_file,) + _TAIL_STATE[log_file][:2])
+        per_file.append(records)
+    
+    # Drop entries for log files that have disappeared
+    for stale in set(_TAIL_STATE) - {entry[0] for entry in signature}:
+        _TAIL_STATE.pop(stale, None)
+        _TAIL_LOCKS.pop(stale, None)
+    
+    signature = tuple(signature)
+    generation = _EVALUATIONS_CACHE
+    if generation['signature'] != signature:
+        generation = _EVALUATIONS_CACHE = {
+            'signature': signature,
+            'evaluations': [e for records in per_file for e in records],
+            # Derived from file identity and offsets, so it is stable across workers
+            'etag': hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()
+        }
+    
+    return generation
+
+def _load_all_evaluations():
+    """Load evaluation data from JSONL files, in file order"""
+    return _load_generation()['evaluations']
+
+def _sorted_evaluations(generation):
+    """A generation's evaluations newest first, sorted once per generation"""
+    if generation.get('sorted') is None:
+        generation['sorted'] = sorted(generation['evaluations'], key=_timestamp_key, reverse=True)
+    return generation['sorted']
+
+def _generation_stats(generation):
+    """A generation's dashboard statistics, calculated once per generation"""
+    if generation.get('stats') is None:
+        generation['stats'] = calculate_stats(generation['evaluations'])
+    return generation['stats']
+
+def load_evaluations():
+    """Load evaluation data from JSONL files, newest first"""
+    return _sorted_evaluations(_load_generation())
+
+def load_recent_evaluations(limit=RECENT_EVALUATIONS_LIMIT, evaluations=None):
+    """Load the newest evaluations without sorting the full history"""
+    if evaluations is None:
+        evaluations = _load_all_evaluations()
+    return heapq.nlargest(limit, evaluations, key=_timestamp_key)
+
+def load_stats():
+    """Load dashboard statistics, reusing them while the logs are unchanged"""
+    return _generation_stats(_load_generation())
 
 def calculate_stats(evaluations):
     """Calculate dashboard statistics"""
@@ -139,38 +361,77 @@ def calculate_stats(evaluations):
             'tasks_count': 0
         }
     
+    # Single pass: counting tasks in a dict gives the distinct count directly
     total = len(evaluations)
-    success_count = sum(1 for e in evaluations if e.get('metrics', {}).get('success', False))
-    total_time = sum(e.get('metrics', {}).get('execution_time_seconds', 0) for e in evaluations)
-    tasks = set(e.get('task', 'unknown') for e in evaluations)
+    success_count = 0
+    total_time = 0.0
+    task_counts = {}
+    for e in evaluations:
+        metrics = e.get('metrics') or {}
+        if metrics.get('success', False):
+            success_count += 1
+        total_time += metrics.get('execution_time_seconds', 0) or 0
+        task = e.get('task', 'unknown')
+        task_counts[task] = task_counts.get(task, 0) + 1
     
     return {
         'total_evaluations': total,
-        'success_rate': success_count / total if total > 0 else 0.0,
-        'avg_execution_time': total_time / total if total > 0 else 0.0,
-        'tasks_count': len(tasks)
+        'success_rate': success_count / total,
+        'avg_execution_time': total_time / total,
+        'tasks_count': len(task_counts)
     }
 
+def _cached_json_response(generation, cache_key, data):
+    """Serve data as JSON, serializing it once per log change and honouring ETags"""
+    body = generation.get(cache_key)
+    if body is None:
+        body = generation[cache_key] = json_dumps(data)
+    
+    response = Response(body, mimetype='application/json')
+    response.set_etag(f"{generation['etag']}-{cache_key}")
+    return response.make_conditional(request)
+
+def build_dashboard_rows(evaluations):
+    """Flatten evaluations into pre-formatted rows for the dashboard template"""
+    rows = []
+    for evaluation in evaluations:
+        metrics = evaluation.get('metrics') or {}
+        quality = metrics.get('itinerary_quality')
+        rows.append({
+            'task': evaluation.get('task', ''),
+            'timestamp': evaluation.get('timestamp', ''),
+            'success': metrics.get('success', False),
+            'time_str': f"{metrics.get('execution_time_seconds', 0):.2f}",
+            'quality_str': f"{quality:.2f}" if quality is not None else None,
+            'suggestions': metrics.get('suggestion_count'),
+            'items': metrics.get('item_count')
+        })
+    return rows
+
 @app.route('/')
 def dashboard():
     """Main dashboard page"""
-    evaluations = load_evaluations()
-    stats = calculate_stats(evaluations)
+    generation = _load_generation()
     
-    return render_template_string(DASHBOARD_HTML, evaluations=evaluations[:50], stats=stats)
+    # The page only changes when the logs do
+    if generation.get('html') is None:
+        generation['html'] = DASHBOARD_TEMPLATE.render(
+            rows=build_dashboard_rows(load_recent_evaluations(evaluations=generation['evaluations'])),
+            stats=_generation_stats(generation)
+        )
+    return generation['html']
 
 @app.route('/api/evaluations')
 def api_evaluations():
     """API endpoint for evaluations"""
-    evaluations = load_evaluations()
-    return jsonify(evaluations)
+    generation = _load_generation()
+    return _cached_json_response(generation, 'evaluations_json', _sorted_evaluations(generation))
 
 @app.route('/api/stats')
 def api_stats():
     """API endpoint for statistics"""
-    evaluations = load_evaluations()
-    stats = calculate_stats(evaluations)
-    return jsonify(stats)
+    generation = _load_generation()
+    return _cached_json_response(generation, 'stats_json', _generation_stats(generation))
 
 if __name__ == '__main__':
     print("🚀 Starting CanTrip Phoenix Dashboard...")
@@ -179,4 +440,16 @@ if __name__ == '__main__':
     print("   - http://localhost:5000/api/evaluations")
     print("   - http://localhost:5000/api/stats")
     
-    app.run(host='0.0.0.0', port=5000, debug=True) 
\ No newline at end of file
+    if os.getenv("FLASK_DEV") == "1":
+        # Development server with the reloader and debugger
+        app.run(host='0.0.0.0', port=5000, debug=True)
+    else:
+        # Production server: gevent workers serve concurrent dashboard fetches
+        os.execvp("gunicorn", [
+            "gunicorn",
+            "-k", "gevent",
+            "-w", os.getenv("DASHBOARD_WORKERS", "4"),
+            "-b", "0.0.0.0:5000",
+            "--pythonpath", os.path.dirname(os.path.abspath(__file__)),
+            "dashboard:app"
+        ]) 
\ No newline at end of file
@@ -5,22 +5,30 @@ Defines the graph structure and nodes for travel planning
 """
 
 import asyncio
+import hashlib
 import json
 import logging
+import operator
 import os
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, TypedDict
-from langchain_core.messages import HumanMessage, AIMessage
+import re
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Annotated, AsyncIterator, Dict, Any, List, Optional, TypedDict, Union
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from langchain_google_vertexai import ChatVertexAI
 from langchain_core.tools import tool
+from pydantic import BaseModel, Field
 
 # Import tools
 from tools.recommend import RecommendationTool
 from tools.events import EventsTool
 from tools.attractions import AttractionsTool
 from tools.planner import PlanningTool
+from tools.cache import cached_tool_call
 
 # Import model router
 from model_router import model_router
@@ -33,6 +41,113 @@ events_tool = EventsTool()
 attractions_tool = AttractionsTool()
 planning_tool = PlanningTool()
 
+# Completed graph responses are reused for identical (normalised) inputs
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_SIZE = 1024
+
+# LLM nodes report failures with an empty payload; such responses are kept only
+# briefly so a transient Vertex AI error isn't replayed for the full TTL
+ERROR_RESPONSE_CACHE_TTL = 30
+TASK_PAYLOAD_FIELDS = {
+    "explore_destination": "suggestions",
+    "generate_itinerary": "itinerary",
+    "generate_packing_list": "packing_list"
+}
+
+def _normalize_input(value: Any) -> Any:
+    """Case- and whitespace-insensitive form of request input for cache keys"""
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {key: _normalize_input(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_input(item) for item in value]
+    return value
+
+def response_cache_key(input_data: Dict[str, Any]) -> str:
+    """Stable digest of the normalised request input"""
+    canonical = json.dumps(_normalize_input(input_data), sort_keys=True, default=str,
+                           separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+# Maximum graph runs in flight for one run_many call (bounded by LLM quota)
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "10"))
+
+# Chat intent patterns, checked in order; the LLM classifier is only used when none match
+INTENT_PATTERNS = [
+    (re.compile(r"\b(pack|packing|luggage|suitcase)\b", re.I), "packing_request"),
+    (re.compile(r"\b(itinerary|schedule|day[- ]by[- ]day)\b", re.I), "itinerary_request"),
+    (re.compile(r"\b(weather|forecast|temperature|rain|snow)\b", re.I), "weather_inquiry"),
+    (re.compile(r"\b(things to do|activit(?:y|ies)|recommend|suggest|attractions?)\b", re.I), "activity_suggestion"),
+    (re.compile(r"\b(plan|planning|trip|vacation|holiday)\b", re.I), "trip_planning"),
+    (re.compile(r"\b(tell me about|visit|visiting|destination)\b", re.I), "destination_inquiry"),
+    (re.compile(r"^\W*(hi|hello|hey|bonjour|good (?:morning|afternoon|evening))\b", re.I), "greeting"),
+]
+
+# Messages with more words than this fall back to the LLM when no pattern matches
+INTENT_LLM_MIN_WORDS = 3
+
+def match_intent(message: str) -> Optional[str]:
+    """Intent of the first matching pattern, or None"""
+    for pattern, intent in INTENT_PATTERNS:
+        if pattern.search(message):
+            return intent
+    return None
+
+# Canned chat reply and follow-up prompts per intent; unknown intents use general_question
+INTENT_RESPONSES = {
+    "destination_inquiry": (
+        "I'd be happy to tell you about {destination}! What specific information are you looking for - attractions, weather, culture, or something else?",
+        ("Tell me about attractions", "What's the weather like?", "Give me cultural tips")
+    ),
+    "trip_planning": (
+        "Great! I can help you plan your trip across Canada. To get started, could you tell me your destination, travel dates, and what interests you?",
+        ("I want to go to Toronto", "Help me plan a trip to Vancouver", "I need a budget-friendly trip to Montreal")
+    ),
+    "weather_inquiry": (
+        "I can help you check the weather for your Canadian destination. Which city or province are you interested in?",
+        ("What's the weather in Toronto?", "How's the weather in Vancouver?", "Weather forecast for Montreal")
+    ),
+    "itinerary_request": (
+        "I'd love to create an itinerary for your Canadian adventure! Please share your destination, dates, and interests.",
+        ("Create a 7-day Toronto itinerary", "Plan a weekend in Vancouver", "Make an itinerary for Montreal")
+    ),
+    "packing_request": (
+        "I can help you create a packing list for your Canadian trip! Tell me your destination, travel dates, and planned activities.",
+        ("Packing list for Toronto", "What to pack for Vancouver", "Winter travel packing list for Canada")
+    ),
+    "general_question": (
+        "I'm your AI Canadian travel assistant! I can help you plan trips across Canada, suggest destinations, create itineraries, check weather, and more. What would you like to know?",
+        ("Tell me about popular Canadian destinations", "Help me plan a trip to Toronto", "What's the weather like in Vancouver?")
+    )
+}
+
+# Static system prompts: the instructions stay identical across requests so provider-side
+# prompt caching can reuse them; only the request details go in the user message
+INTENT_SYSTEM_PROMPT = """Analyze the travel-related message and determine the intent.
+
+Possible intents:
+- destination_inquiry: User wants to know about a specific destination
+- trip_planning: User wants to plan a trip
+- weather_inquiry: User wants weather information
+- activity_suggestion: User wants activity recommendations
+- itinerary_request: User wants an itinerary
+- packing_request: User wants a packing list
+- general_question: General travel question
+- greeting: Simple greeting
+
+Return only the intent category."""
+
+SUGGESTIONS_SYSTEM_PROMPT = """Generate travel suggestions for the city and preferences the user gives \
+(mood, interests, budget, duration, weather, and the number of available events and attractions).
+
+Provide 5-7 detailed suggestions with activities, estimated costs, and timing."""
+
+PACKING_SYSTEM_PROMPT = """Generate a comprehensive packing list for the destination and trip details \
+the user gives (duration, activities, group size, age group, special needs, and weather).
+
+Organize by categories (clothing, toiletries, electronics, etc.) and include quantities."""
+
 # Initialize LLM with model router
 def get_llm_for_agent(agent_type: str, **escalation_factors):
     """Get appropriate LLM for agent type with escalation logic"""
@@ -43,9 +158,14 @@ def get_llm():
     """Get default LLM (Flash model)"""
     return model_router.get_model_by_name(model_router.flash_model)
 
-class TravelState(TypedDict):
-    """State for travel planning"""
-    messages: List[Any]
+class TravelState(TypedDict, total=False):
+    """State for travel planning.
+    
+    Every key is optional: runs start from whatever the request supplies and
+    nodes return partial updates. List fields written by the parallel explore
+    branches are merged with operator.add instead of overwriting each other.
+    """
+    messages: Annotated[List[Any], operator.add]
     city: str
     start_date: str
     end_date: str
@@ -56,9 +176,9 @@ class TravelState(TypedDict):
     accommodation: str
     task: str
     weather: Dict[str, Any]
-    events: List[Any]
-    attractions: List[Any]
-    suggestions: List[Any]
+    events: Annotated[List[Any], operator.add]
+    attractions: Annotated[List[Any], operator.add]
+    suggestions: List[Dict[str, Any]]
     itinerary: Dict[str, Any]
     packing_list: Dict[str, Any]
     mood: str
@@ -73,9 +193,30 @@ class TravelState(TypedDict):
     context: Dict[str, Any]
     history: List[Any]
     response: str
+    chat_suggestions: List[str]
     intent: str
     confidence: float
 
+class Suggestion(BaseModel):
+    """A single travel suggestion"""
+    title: str
+    description: str = ""
+    cost: Optional[str] = Field(default=None, description="Estimated cost, e.g. '$40 per person'")
+    timing: Optional[str] = Field(default=None, description="When to go or how long it takes")
+
+class SuggestionList(BaseModel):
+    """Structured output of the suggestions call"""
+    suggestions: List[Suggestion]
+
+class PackingCategory(BaseModel):
+    """A packing list category and its items (with quantities)"""
+    name: str
+    items: List[str]
+
+class PackingList(BaseModel):
+    """Structured output of the packing list call"""
+    categories: List[PackingCategory]
+
 def create_travel_graph() -> StateGraph:
     """Create the travel planning graph"""
     
@@ -86,8 +227,7 @@ def create_travel_graph() -> StateGraph:
     workflow.add_node("analyze_request", analyze_request_node)
     workflow.add_node("process_chat", process_chat_node)
     workflow.add_node("get_weather", get_weather_node)
-    workflow.add_node("get_events", get_events_node)
-    workflow.add_node("get_attractions", get_attractions_node)
+    workflow.add_node("get_events_and_attractions", get_events_and_attractions_node)
     workflow.add_node("generate_suggestions", generate_suggestions_node)
     workflow.add_node("plan_itinerary", plan_itinerary_node)
     workflow.add_node("generate_packing_list", generate_packing_list_node)
@@ -96,29 +236,27 @@ def create_travel_graph() -> StateGraph:
     # Define edges
     workflow.set_entry_point("analyze_request")
     
-    # Conditional routing based on task
+    # Conditional routing based on task (explore fans out to two nodes)
     workflow.add_conditional_edges(
         "analyze_request",
         route_by_task,
-        {
-            "chat": "process_chat",
-            "explore": "get_weather",
-            "itinerary": "get_weather",
-            "packing": "generate_packing_list"
-        }
+        ["process_chat", "get_weather", "get_events_and_attractions", "generate_packing_list"]
     )
     
     # Chat flow
     workflow.add_edge("process_chat", "finalize_response")
     
-    # Explore flow
-    workflow.add_edge("get_weather", "get_events")
-    workflow.add_edge("get_events", "get_attractions")
-    workflow.add_edge("get_attractions", "generate_suggestions")
+    # Explore flow: weather and the events/attractions lookups run in the same
+    # step and fan back in at generate_suggestions
+    workflow.add_conditional_edges(
+        "get_weather",
+        route_after_weather,
+        ["generate_suggestions", "plan_itinerary"]
+    )
+    workflow.add_edge("get_events_and_attractions", "generate_suggestions")
     workflow.add_edge("generate_suggestions", "finalize_response")
     
-    # Itinerary flow
-    workflow.add_edge("get_weather", "plan_itinerary")
+    # Itinerary flow (weather only)
     workflow.add_edge("plan_itinerary", "finalize_response")
     
     # Packing flow
@@ -129,32 +267,21 @@ def create_travel_graph() -> StateGraph:
     
     return workflow
 
-async def analyze_request_node(state: TravelState) -> TravelState:
-    """Analyze the incoming request and set up the state"""
+async def analyze_request_node(state: TravelState) -> Dict[str, Any]:
+    """Analyze the incoming request; inputs are read as-is (defaults are applied where used)"""
     logger.info("Analyzing request...")
     
-    # Extract information from the request
-    if state.get("task") == "explore_destination":
-        state["city"] = state.get("city", "")
-        state["mood"] = state.get("mood", "")
-        state["duration"] = state.get("duration", 7)
-    elif state.get("task") == "generate_itinerary":
-        state["city"] = state.get("city", "")
-        state["duration"] = calculate_duration(state.get("start_date", ""), state.get("end_date", ""))
-    elif state.get("task") == "generate_packing_list":
-        state["destination"] = state.get("destination", "")
-        state["duration"] = calculate_duration(state.get("start_date", ""), state.get("end_date", ""))
+    task = state.get("task", "unknown")
+    if task == "generate_packing_list":
+        if not state.get("destination"):
+            logger.warning("No destination given for packing list request")
+    elif task in ("explore_destination", "generate_itinerary") and not state.get("city"):
+        logger.warning(f"No city given for {task} request")
     
     # Add analysis message
-    if "messages" not in state:
-        state["messages"] = []
-    state["messages"].append(
-        AIMessage(content=f"Analyzed request for task: {state.get('task', 'unknown')}")
-    )
-    
-    return state
+    return {"messages": [AIMessage(content=f"Analyzed request for task: {task}")]}
 
-async def process_chat_node(state: TravelState) -> TravelState:
+async def process_chat_node(state: TravelState) -> Dict[str, Any]:
     """Process conversational chat messages"""
     logger.info("Processing chat message...")
     
@@ -164,66 +291,45 @@ async def process_chat_node(state: TravelState) -> TravelState:
     context = state.get('context', {})
     history = state.get('history', [])
     
-    # Get appropriate LLM for chat processing
-    chat_llm = get_llm_for_agent("explore", prompt_text=message)
-    
-    # Analyze intent using LLM
-    intent_prompt = f"""
-    Analyze this travel-related message and determine the intent:
-    Message: {message}
-    Context: {context}
-    
-    Possible intents:
-    - destination_inquiry: User wants to know about a specific destination
-    - trip_planning: User wants to plan a trip
-    - weather_inquiry: User wants weather information
-    - activity_suggestion: User wants activity recommendations
-    - itinerary_request: User wants an itinerary
-    - packing_request: User wants a packing list
-    - general_question: General travel question
-    - greeting: Simple greeting
-    
-    Return only the intent category.
-    """
-    
-    try:
-        intent_response = chat_llm.invoke([HumanMessage(content=intent_prompt)])
-        intent = intent_response.content.strip().lower()
-    except Exception as e:
-        logger.error(f"Error analyzing intent: {e}")
+    # Classify intent with the keyword patterns; only ambiguous messages go to the LLM
+    intent = match_intent(message)
+    if intent is None and len(message.split()) > INTENT_LLM_MIN_WORDS:
+        # Small, deterministic model for the fixed-label classification
+        chat_llm = get_llm_for_agent("intent", prompt_text=message)
+        
+        # Analyze intent using LLM
+        intent_prompt = f"Message: {message}\nContext: {json.dumps(context, default=str)}"
+        
+        try:
+            intent_response = await chat_llm.ainvoke([
+                SystemMessage(content=INTENT_SYSTEM_PROMPT),
+                HumanMessage(content=intent_prompt)
+            ])
+            intent = intent_response.content.strip().lower()
+        except Exception as e:
+            logger.error(f"Error analyzing intent: {e}")
+            intent = "general_question"
+    elif intent is None:
         intent = "general_question"
     
     # Generate response based on intent
+    response, suggestions = INTENT_RESPONSES.get(intent, INTENT_RESPONSES["general_question"])
     if intent == "destination_inquiry":
-        response = f"I'd be happy to tell you about {message.split()[-1]}! What specific information are you looking for - attractions, weather, culture, or something else?"
-        suggestions = ["Tell me about attractions", "What's the weather like?", "Give me cultural tips"]
-    elif intent == "trip_planning":
-        response = "Great! I can help you plan your trip across Canada. To get started, could you tell me your destination, travel dates, and what interests you?"
-        suggestions = ["I want to go to Toronto", "Help me plan a trip to Vancouver", "I need a budget-friendly trip to Montreal"]
-    elif intent == "weather_inquiry":
-        response = "I can help you check the weather for your Canadian destination. Which city or province are you interested in?"
-        suggestions = ["What's the weather in Toronto?", "How's the weather in Vancouver?", "Weather forecast for Montreal"]
-    elif intent == "itinerary_request":
-        response = "I'd love to create an itinerary for your Canadian adventure! Please share your destination, dates, and interests."
-        suggestions = ["Create a 7-day Toronto itinerary", "Plan a weekend in Vancouver", "Make an itinerary for Montreal"]
-    elif intent == "packing_request":
-        response = "I can help you create a packing list for your Canadian trip! Tell me your destination, travel dates, and planned activities."
-        suggestions = ["Packing list for Toronto", "What to pack for Vancouver", "Winter travel packing list for Canada"]
-    else:
-        response = "I'm your AI Canadian travel assistant! I can help you plan trips across Canada, suggest destinations, create itineraries, check weather, and more. What would you like to know?"
-        suggestions = ["Tell me about popular Canadian destinations", "Help me plan a trip to Toronto", "What's the weather like in Vancouver?"]
+        response = response.format(destination=message.split()[-1])
+    suggestions = list(suggestions)
     
     # Update state
-    state["intent"] = intent
-    state["response"] = response
-    state["suggestions"] = suggestions
-    state["confidence"] = 0.8
-    
-    return state
+    return {
+        "intent": intent,
+        "response": response,
+        "chat_suggestions": suggestions,
+        "confidence": 0.8
+    }
 
-async def get_weather_node(state: TravelState) -> TravelState:
+async def get_weather_node(state: TravelState) -> Dict[str, Any]:
     """Get weather information for the destination"""
-    logger.info(f"Getting weather for {state.get('city', 'unknown')}")
+    city = state.get("city", "unknown")
+    logger.info(f"Getting weather for {city}")
     
     try:
         # This would integrate with a weather API
@@ -235,310 +341,362 @@ async def get_weather_node(state: TravelState) -> TravelState:
             "wind_speed": 10
         }
         
-        state["weather"] = weather_data
-        if "messages" not in state:
-            state["messages"] = []
-        state["messages"].append(
-            AIMessage(content=f"Weather data retrieved for {state.get('city', 'unknown')}")
-        )
+        return {
+            "weather": weather_data,
+            "messages": [AIMessage(content=f"Weather data retrieved for {city}")]
+        }
         
     except Exception as e:
         logger.error(f"Error getting weather: {e}")
-        state["weather"] = {}
-    
-    return state
+        return {"weather": {}}
 
-async def get_events_node(state: TravelState) -> TravelState:
-    """Get events for the destination"""
-    logger.info(f"Getting events for {state.city}")
+async def get_events_and_attractions_node(state: TravelState) -> Dict[str, Any]:
+    """Get events and attractions for the destination concurrently"""
+    city = (state.get("city") or "").strip()
+    logger.info(f"Getting events and attractions for {city}")
+    
+    # Results are shared with the enhanced graph through the tool cache, which keeps
+    # fallback data only briefly
+    events, attractions = await asyncio.gather(
+        cached_tool_call(("events", city, None, None), lambda: events_tool.get_events(city)),
+        cached_tool_call(("attractions", city), lambda: attractions_tool.get_attractions(city)),
+        return_exceptions=True
+    )
     
-    try:
-        events = await events_tool.get_events(state.city)
-        state.events = events
-        state.messages.append(
-            AIMessage(content=f"Retrieved {len(events)} events for {state.city}")
-        )
-        
-    except Exception as e:
-        logger.error(f"Error getting events: {e}")
-        state.events = []
+    update = {"messages": []}
     
-    return state
-
-async def get_attractions_node(state: TravelState) -> TravelState:
-    """Get attractions for the destination"""
-    logger.info(f"Getting attractions for {state.city}")
+    if isinstance(events, Exception):
+        logger.error(f"Error getting events: {events}")
+        update["events"] = []
+    else:
+        update["events"] = events
+        update["messages"].append(AIMessage(content=f"Retrieved {len(events)} events for {city}"))
     
-    try:
-        attractions = await attractions_tool.get_attractions(state.city)
-        state.attractions = attractions
-        state.messages.append(
-            AIMessage(content=f"Retrieved {len(attractions)} attractions for {state.city}")
-        )
-        
-    except Exception as e:
-        logger.error(f"Error getting attractions: {e}")
-        state.attractions = []
+    if isinstance(attractions, Exception):
+        logger.error(f"Error getting attractions: {attractions}")
+        update["attractions"] = []
+    else:
+        update["attractions"] = attractions
+        update["messages"].append(AIMessage(content=f"Retrieved {len(attractions)} attractions for {city}"))
     
-    return state
+    return update
 
-async def generate_suggestions_node(state: TravelState) -> TravelState:
+async def generate_suggestions_node(state: TravelState) -> Dict[str, Any]:
     """Generate travel suggestions based on mood and interests"""
-    logger.info(f"Generating suggestions for {state.city} with mood: {state.mood}")
+    city = state.get("city", "")
+    duration = state.get("duration", 7)
+    logger.info(f"Generating suggestions for {city} with mood: {state.get('mood', '')}")
     
     try:
         # Build prompt
-        prompt = f"""
-        Generate travel suggestions for {state.city} based on:
-        - Mood: {state.mood}
-        - Interests: {', '.join(state.interests)}
-        - Budget: ${state.budget}
-        - Duration: {state.duration} days
-        - Weather: {state.weather}
-        - Available events: {len(state.events)} events
-        - Available attractions: {len(state.attractions)} attractions
-        
-        Provide 5-7 detailed suggestions with activities, estimated costs, and timing.
-        """
+        prompt = (
+            f"City: {city}\n"
+            f"- Mood: {state.get('mood', '')}\n"
+            f"- Interests: {', '.join(state.get('interests', []))}\n"
+            f"- Budget: ${state.get('budget', 0)}\n"
+            f"- Duration: {duration} days\n"
+            f"- Weather: {state.get('weather', {})}\n"
+            f"- Available events: {len(state.get('events', []))} events\n"
+            f"- Available attractions: {len(state.get('attractions', []))} attractions"
+        )
         
         # Get appropriate LLM with escalation factors
         suggestions_llm = get_llm_for_agent(
             "explore",
             prompt_text=prompt,
             cities=1,  # Single city for explore
-            date_span_days=state.duration,
+            date_span_days=duration,
             tool_chain_length=3  # weather + events + attractions
         )
         
-        response = await suggestions_llm.ainvoke([HumanMessage(content=prompt)])
+        # Structured output replaces parsing free-form text
+        response = await suggestions_llm.with_structured_output(SuggestionList).ainvoke([
+            SystemMessage(content=SUGGESTIONS_SYSTEM_PROMPT),
+            HumanMessage(content=prompt)
+        ])
+        suggestions = [suggestion.model_dump(exclude_none=True) for suggestion in response.suggestions]
         
-        # Parse suggestions (this would be more sophisticated in practice)
-        suggestions = parse_suggestions(response.content)
-        state.suggestions = suggestions
-        
-        state.messages.append(
-            AIMessage(content=f"Generated {len(suggestions)} suggestions for {state.city}")
-        )
+        return {
+            "suggestions": suggestions,
+            "messages": [AIMessage(content=f"Generated {len(suggestions)} suggestions for {city}")]
+        }
         
     except Exception as e:
         logger.error(f"Error generating suggestions: {e}")
-        state.suggestions = []
-    
-    return state
+        return {"suggestions": []}
 
-async def plan_itinerary_node(state: TravelState) -> TravelState:
+async def plan_itinerary_node(state: TravelState) -> Dict[str, Any]:
     """Plan a detailed itinerary"""
-    logger.info(f"Planning itinerary for {state.city}")
+    city = state.get("city", "")
+    logger.info(f"Planning itinerary for {city}")
     
     try:
         # Calculate date span for escalation logic
-        date_span_days = calculate_duration(state.start_date, state.end_date)
+        date_span_days = calculate_duration(state.get("start_date", ""), state.get("end_date", ""))
         
         # Use planning tool to create itinerary with appropriate model
         itinerary = await planning_tool.create_itinerary(
-            city=state.city,
-            start_date=state.start_date,
-            end_date=state.end_date,
-            interests=state.interests,
-            budget=state.budget,
-            group_size=state.group_size,
-            pace=state.pace,
-            accommodation=state.accommodation,
-            weather=state.weather,
+            city=city,
+            start_date=state.get("start_date", ""),
+            end_date=state.get("end_date", ""),
+            interests=state.get("interests", []),
+            budget=state.get("budget", 0.0),
+            group_size=state.get("group_size", 1),
+            pace=state.get("pace", ""),
+            accommodation=state.get("accommodation", ""),
+            weather=state.get("weather", {}),
             date_span_days=date_span_days  # Pass for escalation logic
         )
         
-        state.itinerary = itinerary
-        state.messages.append(
-            AIMessage(content=f"Created itinerary for {state.city}")
-        )
+        return {
+            "itinerary": itinerary,
+            "messages": [AIMessage(content=f"Created itinerary for {city}")]
+        }
         
     except Exception as e:
         logger.error(f"Error planning itinerary: {e}")
-        state.itinerary = {}
-    
-    return state
+        return {"itinerary": {}}
 
-async def generate_packing_list_node(state: TravelState) -> TravelState:
+async def generate_packing_list_node(state: TravelState) -> Dict[str, Any]:
     """Generate a packing list"""
-    logger.info(f"Generating packing list for {state.destination}")
+    destination = state.get("destination", "")
+    duration = state.get("duration", 7)
+    logger.info(f"Generating packing list for {destination}")
     
     try:
         # Build prompt
-        prompt = f"""
-        Generate a comprehensive packing list for {state.destination} based on:
-        - Duration: {state.duration} days
-        - Activities: {', '.join(state.activities)}
-        - Group size: {state.group_size}
-        - Age group: {state.age_group}
-        - Special needs: {', '.join(state.special_needs)}
-        - Weather: {state.weather}
-        
-        Organize by categories (clothing, toiletries, electronics, etc.) and include quantities.
-        """
+        prompt = (
+            f"Destination: {destination}\n"
+            f"- Duration: {duration} days\n"
+            f"- Activities: {', '.join(state.get('activities', []))}\n"
+            f"- Group size: {state.get('group_size', 1)}\n"
+            f"- Age group: {state.get('age_group', '')}\n"
+            f"- Special needs: {', '.join(state.get('special_needs', []))}\n"
+            f"- Weather: {state.get('weather', {})}"
+        )
         
         # Get appropriate LLM for packing list generation
         packing_llm = get_llm_for_agent(
             "packing",
             prompt_text=prompt,
-            date_span_days=state.duration
+            date_span_days=duration
         )
         
-        response = await packing_llm.ainvoke([HumanMessage(content=prompt)])
-        
-        # Parse packing list (this would be more sophisticated in practice)
-        packing_list = parse_packing_list(response.content)
-        state.packing_list = packing_list
+        # Structured output replaces parsing free-form text
+        response = await packing_llm.with_structured_output(PackingList).ainvoke([
+            SystemMessage(content=PACKING_SYSTEM_PROMPT),
+            HumanMessage(content=prompt)
+        ])
+        packing_list = {
+            'categories': [],
+            'total_items': 0
+        }
+        for category in response.categories:
+            if category.items:
+                packing_list['categories'].append({'name': category.name, 'items': category.items})
+                packing_list['total_items'] += len(category.items)
         
-        state.messages.append(
-            AIMessage(content=f"Generated packing list for {state.destination}")
-        )
+        return {
+            "packing_list": packing_list,
+            "messages": [AIMessage(content=f"Generated packing list for {destination}")]
+        }
         
     except Exception as e:
         logger.error(f"Error generating packing list: {e}")
-        state.packing_list = {}
-    
-    return state
+        return {"packing_list": {}}
 
-async def finalize_response_node(state: TravelState) -> TravelState:
+async def finalize_response_node(state: TravelState) -> Dict[str, Any]:
     """Finalize the response based on the task"""
     logger.info("Finalizing response...")
     
     # Add final message
-    state.messages.append(
-        AIMessage(content="Response finalized successfully")
-    )
-    
-    return state
+    return {"messages": [AIMessage(content="Response finalized successfully")]}
 
-def route_by_task(state: TravelState) -> str:
-    """Route to the appropriate flow based on task"""
-    if state.task == "explore_destination":
-        return "explore"
-    elif state.task == "generate_itinerary":
-        return "itinerary"
-    elif state.task == "generate_packing_list":
-        return "packing"
+def route_by_task(state: TravelState) -> Union[str, List[str]]:
+    """Route to the node(s) for the task; explore fans out to its independent lookups"""
+    task = state.get("task")
+    if task == "chat":
+        return "process_chat"
+    elif task == "generate_itinerary":
+        return "get_weather"
+    elif task == "generate_packing_list":
+        return "generate_packing_list"
     else:
-        return "explore"  # default
+        return ["get_weather", "get_events_and_attractions"]  # explore (default)
+
+def route_after_weather(state: TravelState) -> str:
+    """Itineraries continue from weather alone; explore joins the events/attractions lookup"""
+    if state.get("task") == "generate_itinerary":
+        return "plan_itinerary"
+    return "generate_suggestions"
 
 def calculate_duration(start_date: str, end_date: str) -> int:
     """Calculate duration in days between two dates"""
     try:
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-        return (end - start).days
-    except:
+        return (date.fromisoformat(end_date) - date.fromisoformat(start_date)).days
+    except (TypeError, ValueError):
         return 7  # default
 
-def parse_suggestions(content: str) -> List[Dict]:
-    """Parse LLM response into structured suggestions"""
-    # This is a simplified parser - in practice, you'd want more robust parsing
-    suggestions = []
-    
-    # Split by lines and look for numbered items
-    lines = content.split('\n')
-    current_suggestion = {}
-    
-    for line in lines:
-        line = line.strip()
-        if line.startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.')):
-            if current_suggestion:
-                suggestions.append(current_suggestion)
-            current_suggestion = {'title': line[3:].strip()}
-        elif line and current_suggestion:
-            if 'description' not in current_suggestion:
-                current_suggestion['description'] = line
-            elif 'cost' not in current_suggestion and '$' in line:
-                current_suggestion['cost'] = line
-    
-    if current_suggestion:
-        suggestions.append(current_suggestion)
-    
-    return suggestions
-
-def parse_packing_list(content: str) -> Dict:
-    """Parse LLM response into structured packing list"""
-    # This is a simplified parser - in practice, you'd want more robust parsing
-    packing_list = {
-        'categories': [],
-        'total_items': 0
-    }
-    
-    # Split by categories
-    categories = content.split('\n\n')
-    
-    for category in categories:
-        if ':' in category:
-            lines = category.split('\n')
-            category_name = lines[0].replace(':', '').strip()
-            items = []
-            
-            for line in lines[1:]:
-                if line.strip() and not line.startswith('-'):
-                    items.append(line.strip())
-            
-            if items:
-                packing_list['categories'].append({
-                    'name': category_name,
-                    'items': items
-                })
-                packing_list['total_items'] += len(items)
-    
-    return packing_list
+@lru_cache(maxsize=1)
+def get_compiled_graph():
+    """The compiled travel graph, built once per process and shared by all runs"""
+    return create_travel_graph().compile()
 
 class TravelPlanningGraph:
     """Main class for the travel planning graph"""
     
     def __init__(self):
-        self.graph = create_travel_graph()
-        self.app = self.graph.compile()
+        self.app = get_compiled_graph()
+        
+        # Response cache: key -> (expiry time, result), least recently used first
+        self._response_cache: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    def _cached_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result for a key with a fresh timestamp, or None if missing or expired"""
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._response_cache[key]
+            return None
+        self._response_cache.move_to_end(key)
+        return {**result, "generated_at": datetime.now().isoformat()}
+    
+    def _store_response(self, key: str, task: str, result: Dict[str, Any]):
+        """Cache a result, evicting the least recently used entries"""
+        ttl = RESPONSE_CACHE_TTL if result.get(TASK_PAYLOAD_FIELDS[task]) else ERROR_RESPONSE_CACHE_TTL
+        self._response_cache[key] = (time.monotonic() + ttl, result)
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+    
+    @staticmethod
+    def _initial_state(input_data: Dict[str, Any]) -> TravelState:
+        """Initial state from the known state fields of the input"""
+        state = {field: value for field, value in input_data.items()
+                 if field in TravelState.__annotations__}
+        if state.get("task") in ("generate_itinerary", "generate_packing_list"):
+            state["duration"] = calculate_duration(state.get("start_date", ""), state.get("end_date", ""))
+        return state
+    
+    @staticmethod
+    def _build_response(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Extract the task's response from the final graph state; None for unknown tasks"""
+        task = result.get("task")
+        if task == "explore_destination":
+            return {
+                "suggestions": result.get("suggestions", []),
+                "weather": result.get("weather", {}),
+                "events": result.get("events", []),
+                "generated_at": datetime.now().isoformat()
+            }
+        elif task == "generate_itinerary":
+            itinerary = result.get("itinerary", {})
+            return {
+                "itinerary": itinerary,
+                "duration": result.get("duration"),
+                "total_cost": itinerary.get("total_cost", 0.0),
+                "generated_at": datetime.now().isoformat()
+            }
+        elif task == "generate_packing_list":
+            packing_list = result.get("packing_list", {})
+            return {
+                "packing_list": packing_list,
+                "weather": result.get("weather", {}),
+                "total_items": packing_list.get("total_items", 0),
+                "generated_at": datetime.now().isoformat()
+            }
+        return None
     
     async def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Run the travel planning graph"""
         try:
-            # Create initial state
-            state = TravelState()
-            
-            # Populate state from input
-            for key, value in input_data.items():
-                if hasattr(state, key):
-                    setattr(state, key, value)
+            key = response_cache_key(input_data)
+            cached = self._cached_response(key)
+            if cached is not None:
+                return cached
             
             # Run the graph
-            result = await self.app.ainvoke(state)
+            result = await self.app.ainvoke(self._initial_state(input_data))
             
             # Extract results based on task
-            if state.task == "explore_destination":
-                return {
-                    "suggestions": state.suggestions,
-                    "weather": state.weather,
-                    "events": state.events,
-                    "generated_at": datetime.now().isoformat()
-                }
-            elif state.task == "generate_itinerary":
-                return {
-                    "itinerary": state.itinerary,
-                    "duration": state.duration,
-                    "total_cost": state.itinerary.get("total_cost", 0.0),
-                    "generated_at": datetime.now().isoformat()
-                }
-            elif state.task == "generate_packing_list":
-                return {
-                    "packing_list": state.packing_list,
-                    "weather": state.weather,
-                    "total_items": state.packing_list.get("total_items", 0),
-                    "generated_at": datetime.now().isoformat()
-                }
-            else:
+            response = self._build_response(result)
+            if response is None:
                 return {
                     "error": "Unknown task",
                     "generated_at": datetime.now().isoformat()
                 }
+            
+            self._store_response(key, result["task"], response)
+            return response
                 
         except Exception as e:
             logger.error(f"Error running travel planning graph: {e}")
             return {
                 "error": str(e),
                 "generated_at": datetime.now().isoformat()
-            } 
\ No newline at end of file
+            }
+    
+    async def run_many(self, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run several independent requests (e.g. a city comparison) concurrently.
+        
+        Results are returned in input order; at most MAX_CONCURRENT_RUNS run at once.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_RUNS)
+        
+        async def run_one(input_data: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.run(input_data)
+        
+        return await asyncio.gather(*(run_one(input_data) for input_data in inputs))
+    
+    async def stream(self, input_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Run the travel planning graph, yielding progress as it happens.
+        
+        Yields {"type": "node", "node": ...} as each node finishes,
+        {"type": "token", "node": ..., "content": ...} for LLM output deltas
+        (tool-call argument text for structured calls), and finally
+        {"type": "result", "data": ...} with the same payload run() returns.
+        """
+        key = response_cache_key(input_data)
+        cached = self._cached_response(key)
+        if cached is not None:
+            yield {"type": "result", "data": cached}
+            return
+        
+        result = {}
+        try:
+            async for mode, payload in self.app.astream(
+                    self._initial_state(input_data), stream_mode=["messages", "updates", "values"]):
+                if mode == "messages":
+                    chunk, metadata = payload
+                    content = chunk.content if isinstance(chunk.content, str) else ""
+                    if not content:
+                        content = "".join(tool_chunk.get("args") or ""
+                                          for tool_chunk in getattr(chunk, "tool_call_chunks", ()))
+                    if content:
+                        yield {"type": "token", "node": metadata.get("langgraph_node"), "content": content}
+                elif mode == "updates":
+                    for node in payload:
+                        yield {"type": "node", "node": node}
+                else:
+                    result = payload
+            
+            response = self._build_response(result)
+            if response is None:
+                response = {
+                    "error": "Unknown task",
+                    "generated_at": datetime.now().isoformat()
+                }
+            else:
+                self._store_response(key, result["task"], response)
+            
+        except Exception as e:
+            logger.error(f"Error streaming travel planning graph: {e}")
+            response = {
+                "error": str(e),
+                "generated_at": datetime.now().isoformat()
+            }
+        
+        yield {"type": "result", "data": response}
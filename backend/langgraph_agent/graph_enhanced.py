@@ -10,11 +10,18 @@ import logging
 import os
 import re
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, TypedDict
+from functools import lru_cache
+from typing import Dict, Any, AsyncIterator, FrozenSet, List, Optional, Tuple, TypedDict
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 from langchain_google_vertexai import ChatVertexAI
 
+# Prefer orjson for serializing tool data into prompts, fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import model router
 from model_router import model_router
 
@@ -24,12 +31,102 @@ from tools.attractions import AttractionsTool
 from tools.planner import PlanningTool
 from tools.recommend import RecommendationTool
 from tools.weather import WeatherTool
+from tools.cache import cached_tool_call, is_fallback_result
 
 logger = logging.getLogger(__name__)
 
+# Initialize tools once; they only hold config and use the shared HTTP session per call
+events_tool = EventsTool()
+attractions_tool = AttractionsTool()
+planner_tool = PlanningTool()
+recommend_tool = RecommendationTool()
+weather_tool = WeatherTool()
+
+# Keywords, tool, and intent per category; a later match overrides the intent
+INTENT_KEYWORDS = [
+    (['event', 'events', 'concert', 'show', 'game', 'sports', 'festival', 'happening', 'this weekend', 'tonight'], "events", "events_inquiry"),
+    (['weather', 'temperature', 'climate', 'rain', 'snow', 'sunny', 'forecast', 'hot', 'cold'], "weather", "weather_inquiry"),
+    (['attraction', 'attractions', 'museum', 'gallery', 'landmark', 'sightseeing', 'visit', 'see', 'explore'], "attractions", "attractions_inquiry"),
+    (['plan', 'itinerary', 'schedule', 'trip', 'visit', 'go to', 'travel', 'day', 'weekend'], "planner", "planning_inquiry"),
+    (['recommend', 'suggest', 'best', 'popular', 'good', 'where to', 'what to do'], "recommendations", "recommendations_inquiry"),
+]
+
+# Common verbs that might be confused with event types
+EVENT_TYPE_SKIP_WORDS = ['show me', 'show you', 'show us', 'tell me', 'give me', 'find me']
+
+# Keywords per event type; the first matching type wins
+EVENT_TYPE_KEYWORDS = [
+    (['concert', 'music', 'band', 'singer'], 'music'),
+    (['sports', 'game', 'match', 'hockey', 'basketball', 'baseball'], 'sports'),
+    (['festival', 'fair', 'celebration'], 'festival'),
+    (['theater', 'theatre', 'play', 'musical', 'drama'], 'theater'),
+    (['comedy', 'standup', 'joke'], 'comedy'),
+]
+
+INTEREST_KEYWORDS = {
+    'music': ['music', 'concert', 'band', 'singer'],
+    'sports': ['sports', 'game', 'hockey', 'basketball', 'baseball'],
+    'arts': ['art', 'museum', 'gallery', 'theater', 'theatre'],
+    'food': ['food', 'restaurant', 'dining', 'cuisine'],
+    'outdoor': ['outdoor', 'hiking', 'park', 'nature', 'beach'],
+    'culture': ['culture', 'cultural', 'history', 'heritage'],
+    'family': ['family', 'kids', 'children'],
+    'nightlife': ['nightlife', 'bar', 'club', 'drinks']
+}
+
+def _build_keyword_index() -> Tuple[Dict[str, FrozenSet[Tuple[str, str]]], List[Tuple[str, FrozenSet[Tuple[str, str]]]]]:
+    """Map each single-word keyword to its (kind, label) pairs; multi-word phrases are listed separately"""
+    labels: Dict[str, set] = {}
+    for words, tool, _ in INTENT_KEYWORDS:
+        for word in words:
+            labels.setdefault(word, set()).add(("tool", tool))
+    for word in EVENT_TYPE_SKIP_WORDS:
+        labels.setdefault(word, set()).add(("skip", ""))
+    for words, event_type in EVENT_TYPE_KEYWORDS:
+        for word in words:
+            labels.setdefault(word, set()).add(("event_type", event_type))
+    for interest, words in INTEREST_KEYWORDS.items():
+        for word in words:
+            labels.setdefault(word, set()).add(("interest", interest))
+    
+    words = {word: frozenset(found) for word, found in labels.items() if " " not in word}
+    phrases = [(phrase, frozenset(found)) for phrase, found in labels.items() if " " in phrase]
+    return words, phrases
+
+KEYWORD_LABELS, PHRASE_LABELS = _build_keyword_index()
+
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+@lru_cache(maxsize=2048)
+def scan_keywords(message_lower: str) -> FrozenSet[Tuple[str, str]]:
+    """Every (kind, label) whose keywords occur as whole words in the lowercased message"""
+    # Tokenize once; plurals of keywords also count as the keyword ("museums" -> "museum").
+    # Only keyword singulars are added, so "this" or "bus" never become "thi" or "bu"
+    tokens = set(WORD_PATTERN.findall(message_lower))
+    tokens.update([token[:-1] for token in tokens
+                   if token.endswith('s') and token[:-1] in KEYWORD_LABELS])
+    
+    found = set()
+    for token in tokens.intersection(KEYWORD_LABELS):
+        found |= KEYWORD_LABELS[token]
+    for phrase, phrase_labels in PHRASE_LABELS:
+        if phrase in message_lower:
+            found |= phrase_labels
+    return frozenset(found)
+
+# Empty result used in place of a tool's data when its call fails
+TOOL_RESULT_DEFAULTS = {
+    "events": list,
+    "weather": dict,
+    "attractions": list,
+    "recommendations": list,
+    "plan": dict
+}
+
 class EnhancedTravelState(TypedDict):
     """Enhanced state for travel planning with tool integration"""
     message: str
+    message_lower: str
     session_id: str
     context: Dict[str, Any]
     history: List[Any]
@@ -48,175 +145,145 @@ def create_enhanced_travel_graph() -> StateGraph:
     workflow = StateGraph(EnhancedTravelState)
     
     # Add nodes
-    workflow.add_node("analyze_intent", analyze_intent_node)
-    workflow.add_node("call_tools", call_tools_node)
+    workflow.add_node("classify_and_call", classify_and_call_tools_node)
     workflow.add_node("generate_response", generate_response_node)
-    workflow.add_node("finalize_response", finalize_response_node)
     
     # Define edges
-    workflow.set_entry_point("analyze_intent")
-    workflow.add_edge("analyze_intent", "call_tools")
-    workflow.add_edge("call_tools", "generate_response")
-    workflow.add_edge("generate_response", "finalize_response")
-    workflow.add_edge("finalize_response", END)
+    workflow.set_entry_point("classify_and_call")
+    workflow.add_edge("classify_and_call", "generate_response")
+    workflow.add_edge("generate_response", END)
     
     return workflow
 
-async def analyze_intent_node(state: EnhancedTravelState) -> EnhancedTravelState:
-    """Analyze user intent and determine which tools to use"""
-    logger.info("Analyzing user intent...")
-    
-    message = state.get('message', '').lower()
-    history = state.get('history', [])
-    
+@lru_cache(maxsize=2048)
+def classify_message(message_lower: str) -> Tuple[str, Tuple[str, ...], Optional[str]]:
+    """Intent, tools needed, and city for a lowercased message; cached since repeat queries are common"""
     # Detect city from message
-    city = detect_city_from_message(state.get('message', ''))
-    state["city_detected"] = city
+    city = detect_city_from_message(message_lower)
     
     # Analyze intent and determine tools needed
     tools_needed = []
     intent = "general_question"
     
-    # Event-related queries
-    if any(word in message for word in ['event', 'events', 'concert', 'show', 'game', 'sports', 'festival', 'happening', 'this weekend', 'tonight']):
-        tools_needed.append("events")
-        intent = "events_inquiry"
-    
-    # Weather-related queries
-    if any(word in message for word in ['weather', 'temperature', 'climate', 'rain', 'snow', 'sunny', 'forecast', 'hot', 'cold']):
-        tools_needed.append("weather")
-        intent = "weather_inquiry"
-    
-    # Attraction-related queries
-    if any(word in message for word in ['attraction', 'attractions', 'museum', 'gallery', 'landmark', 'sightseeing', 'visit', 'see', 'explore']):
-        tools_needed.append("attractions")
-        intent = "attractions_inquiry"
-    
-    # Planning-related queries
-    if any(word in message for word in ['plan', 'itinerary', 'schedule', 'trip', 'visit', 'go to', 'travel', 'day', 'weekend']):
-        tools_needed.append("planner")
-        intent = "planning_inquiry"
-    
-    # Recommendation queries
-    if any(word in message for word in ['recommend', 'suggest', 'best', 'popular', 'good', 'where to', 'what to do']):
-        tools_needed.append("recommendations")
-        intent = "recommendations_inquiry"
+    # Event, weather, attraction, planning, and recommendation queries
+    found = scan_keywords(message_lower)
+    for _, tool, tool_intent in INTENT_KEYWORDS:
+        if ("tool", tool) in found:
+            tools_needed.append(tool)
+            intent = tool_intent
     
     # If no specific intent detected but city is mentioned, get general recommendations
     if city and not tools_needed:
         tools_needed = ["recommendations", "attractions"]
         intent = "general_city_inquiry"
     
-    state["intent"] = intent
-    state["tools_used"] = tools_needed
+    return intent, tuple(tools_needed), city
+
+async def analyze_intent_node(state: EnhancedTravelState) -> Dict[str, Any]:
+    """Analyze user intent and determine which tools to use"""
+    logger.info("Analyzing user intent...")
+    
+    # Lowercased once here and reused by every keyword helper
+    message = state.get('message', '').lower().strip()
+    
+    intent, tools_needed, city = classify_message(message)
     
     logger.info(f"Detected intent: {intent}, tools needed: {tools_needed}, city: {city}")
     
-    return state
+    return {
+        "message_lower": message,
+        "city_detected": city,
+        "intent": intent,
+        "tools_used": list(tools_needed)
+    }
 
-async def call_tools_node(state: EnhancedTravelState) -> EnhancedTravelState:
+async def call_tools_node(state: EnhancedTravelState) -> Dict[str, Any]:
     """Call the appropriate tools based on intent analysis"""
     logger.info("Calling tools...")
     
     tools_needed = state.get("tools_used", [])
     city = state.get("city_detected")
-    message = state.get("message", "")
+    message_lower = state.get("message_lower", "")
     tool_results = {}
     
     try:
-        # Initialize tools
-        events_tool = EventsTool()
-        attractions_tool = AttractionsTool()
-        planner_tool = PlanningTool()
-        recommend_tool = RecommendationTool()
-        weather_tool = WeatherTool()
+        # Build one coroutine per requested tool; they are independent, so run them concurrently
+        tasks = {}
         
-        # Call events tool
         if "events" in tools_needed and city:
             logger.info(f"Calling events tool for {city}")
-            try:
-                # Extract event type and date from message
-                event_type = extract_event_type(message)
-                event_date = extract_date(message)
-                events = await events_tool.get_events(city, date=event_date, category=event_type)
-                tool_results["events"] = events
-                logger.info(f"Found {len(events)} events")
-            except Exception as e:
-                logger.error(f"Error calling events tool: {e}")
-                tool_results["events"] = []
+            # Extract event type and date from message
+            event_type = extract_event_type(message_lower)
+            event_date = extract_date(message_lower)
+            tasks["events"] = cached_tool_call(
+                ("events", city, event_date, event_type),
+                lambda: events_tool.get_events(city, date=event_date, category=event_type)
+            )
         
-        # Call weather tool
         if "weather" in tools_needed and city:
             logger.info(f"Calling weather tool for {city}")
-            try:
-                weather = await weather_tool.get_current_weather(city)
-                forecast = await weather_tool.get_weather_forecast(city, 3)
-                tool_results["weather"] = {
-                    "current": weather,
-                    "forecast": forecast
-                }
-                logger.info("Weather data retrieved")
-            except Exception as e:
-                logger.error(f"Error calling weather tool: {e}")
-                tool_results["weather"] = {}
+            tasks["weather"] = cached_tool_call(
+                ("weather", city),
+                lambda: weather_tool.get_current_and_forecast(city, 3)
+            )
         
-        # Call attractions tool
         if "attractions" in tools_needed and city:
             logger.info(f"Calling attractions tool for {city}")
-            try:
-                attractions = await attractions_tool.get_attractions(city)
-                tool_results["attractions"] = attractions
-                logger.info(f"Found {len(attractions)} attractions")
-            except Exception as e:
-                logger.error(f"Error calling attractions tool: {e}")
-                tool_results["attractions"] = []
+            tasks["attractions"] = cached_tool_call(
+                ("attractions", city),
+                lambda: attractions_tool.get_attractions(city)
+            )
         
-        # Call recommendations tool
         if "recommendations" in tools_needed and city:
             logger.info(f"Calling recommendations tool for {city}")
-            try:
-                recommendations = await recommend_tool.get_recommendations(city)
-                tool_results["recommendations"] = recommendations
-                logger.info(f"Found {len(recommendations)} recommendations")
-            except Exception as e:
-                logger.error(f"Error calling recommendations tool: {e}")
-                tool_results["recommendations"] = []
+            tasks["recommendations"] = cached_tool_call(
+                ("recommendations", city),
+                lambda: recommend_tool.get_recommendations(city)
+            )
         
-        # Call planner tool
         if "planner" in tools_needed and city:
             logger.info(f"Calling planner tool for {city}")
-            try:
-                # Extract planning parameters from message
-                duration = extract_duration(message)
-                budget = extract_budget(message)
-                interests = extract_interests(message)
-                
-                plan = await planner_tool.create_itinerary(
-                    city=city,
-                    duration=duration,
-                    budget=budget,
-                    interests=interests
-                )
-                tool_results["plan"] = plan
-                logger.info("Itinerary created")
-            except Exception as e:
-                logger.error(f"Error calling planner tool: {e}")
-                tool_results["plan"] = {}
+            # Extract planning parameters from message
+            tasks["plan"] = planner_tool.create_itinerary(
+                city=city,
+                duration=extract_duration(message_lower),
+                budget=extract_budget(message_lower),
+                interests=extract_interests(message_lower)
+            )
         
-        state["data"] = tool_results
+        # A failing tool falls back to its empty default without affecting the others
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for key, result in zip(tasks, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error calling {key} tool: {result}")
+                tool_results[key] = TOOL_RESULT_DEFAULTS[key]()
+            elif key == "weather":
+                tool_results["weather"] = result
+                logger.info("Weather data retrieved")
+            elif key == "plan":
+                tool_results["plan"] = result
+                logger.info("Itinerary created")
+            else:
+                tool_results[key] = result
+                logger.info(f"Found {len(result)} {key}")
         
     except Exception as e:
         logger.error(f"Error in tool calling: {e}")
-        state["data"] = {}
+        tool_results = {}
     
-    return state
+    return {"data": tool_results}
 
-async def generate_response_node(state: EnhancedTravelState) -> EnhancedTravelState:
+async def classify_and_call_tools_node(state: EnhancedTravelState) -> Dict[str, Any]:
+    """Analyze intent and call the needed tools as one graph step"""
+    update = await analyze_intent_node(state)
+    update.update(await call_tools_node({**state, **update}))
+    return update
+
+async def generate_response_node(state: EnhancedTravelState) -> Dict[str, Any]:
     """Generate response using LLM with tool results"""
     logger.info("Generating response...")
     
     message = state.get('message', '')
-    session_id = state.get('session_id', '')
     context = state.get('context', {})
     history = state.get('history', [])
     intent = state.get('intent', '')
@@ -224,9 +291,19 @@ async def generate_response_node(state: EnhancedTravelState) -> EnhancedTravelSt
     tool_results = state.get('data', {})
     tools_used = state.get('tools_used', [])
     
+    # Plain data lookups are rendered directly without an LLM round-trip
+    rendered = render_data_response(intent, city, tools_used, tool_results)
+    if rendered:
+        return {
+            "response": rendered,
+            "suggestions": generate_suggestions(intent, city, tool_results),
+            "confidence": 0.9
+        }
+    
     try:
-        # Get appropriate LLM
-        chat_llm = model_router.get_model_for_agent("explore", prompt_text=message)
+        # Get appropriate LLM; constructing the Vertex client resolves credentials with
+        # blocking I/O, so keep it off the event loop
+        chat_llm = await asyncio.to_thread(model_router.get_model_for_agent, "explore", prompt_text=message)
         
         # Create comprehensive system prompt
         system_prompt = create_system_prompt(intent, city, tools_used, tool_results)
@@ -235,8 +312,8 @@ async def generate_response_node(state: EnhancedTravelState) -> EnhancedTravelSt
         user_prompt = f"""
         User message: "{message}"
         
-        Context: {context}
-        History: {history}
+        Context: {compact_json(context)}
+        History: {compact_json(summarize_history(history))}
         
         Please provide a helpful, detailed response based on the available data and tools.
         """
@@ -252,32 +329,132 @@ async def generate_response_node(state: EnhancedTravelState) -> EnhancedTravelSt
         # Generate suggestions based on intent and results
         suggestions = generate_suggestions(intent, city, tool_results)
         
-        state["response"] = response.content
-        state["suggestions"] = suggestions
-        state["confidence"] = 0.9
+        return {
+            # Ensure we have a response
+            "response": response.content or "I'm here to help with your travel planning!",
+            "suggestions": suggestions,
+            "confidence": 0.9
+        }
         
     except Exception as e:
         logger.error(f"Error generating response: {e}")
-        state["response"] = "I'm here to help with your Canadian travel planning! What would you like to know?"
-        state["suggestions"] = ["Tell me about popular Canadian destinations", "Help me plan a trip"]
-        state["confidence"] = 0.5
-    
-    return state
-
-async def finalize_response_node(state: EnhancedTravelState) -> EnhancedTravelState:
-    """Finalize the response"""
-    logger.info("Finalizing response...")
+        return {
+            "response": "I'm here to help with your Canadian travel planning! What would you like to know?",
+            "suggestions": ["Tell me about popular Canadian destinations", "Help me plan a trip"],
+            "confidence": 0.5
+        }
+
+# Most list items from a tool that are shown to the LLM
+PROMPT_ITEM_LIMIT = 10
+
+# Fields of each tool's list items that the system prompt refers to
+PROMPT_FIELDS = {
+    "events": ("name", "date", "end_date", "time", "location", "price_range", "booking_url"),
+    "attractions": ("name", "description", "location", "hours", "price_range", "estimated_cost"),
+    "recommendations": ("name", "description", "category", "location", "price_range", "estimated_cost")
+}
+
+def compact_json(data: Any) -> str:
+    """Serialize prompt data without indentation to keep token counts down"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, separators=(',', ':'))
+
+def summarize_items(tool: str, items: List[Dict[str, Any]]) -> str:
+    """Compact JSON of the first few items, projected to the fields the prompt uses"""
+    fields = PROMPT_FIELDS[tool]
+    return compact_json([
+        {field: item[field] for field in fields if field in item}
+        for item in items[:PROMPT_ITEM_LIMIT]
+    ])
+
+def render_weather_response(city: str, weather: Dict[str, Any]) -> Optional[str]:
+    """Weather reply rendered from tool data; None for fallback data, which the LLM should caveat"""
+    current = weather.get("current") or {}
+    if not current or is_fallback_result(weather):
+        return None
     
-    # Ensure we have a response
-    if not state.get("response"):
-        state["response"] = "I'm here to help with your travel planning!"
+    lines = [
+        "Current weather in {city}: {temperature:.1f}°C, {condition}, {humidity}% humidity, {wind:.1f} km/h winds.".format(
+            city=city,
+            temperature=float(current.get("temperature", 0)),
+            condition=current.get("condition", "Unknown"),
+            humidity=current.get("humidity", 0),
+            wind=float(current.get("wind_speed", 0))
+        )
+    ]
+    forecast = weather.get("forecast") or []
+    if forecast:
+        lines.append("")
+        lines.append("Forecast:")
+        lines.extend(
+            "- {date}: {condition}, high {high:.0f}°C / low {low:.0f}°C".format(
+                date=day.get("date", ""),
+                condition=day.get("condition", "Unknown"),
+                high=float(day.get("high_temp", 0)),
+                low=float(day.get("low_temp", 0))
+            )
+            for day in forecast
+        )
+    return "\n".join(lines)
+
+def render_attractions_response(city: str, attractions: List[Dict[str, Any]]) -> Optional[str]:
+    """Attractions reply rendered from tool data; None for fallback data, which the LLM should caveat"""
+    if is_fallback_result(attractions):
+        return None
     
-    return state
+    lines = [f"Here are some attractions in {city}:", ""]
+    for attraction in attractions[:PROMPT_ITEM_LIMIT]:
+        details = "; ".join(str(attraction[field]) for field in ("hours", "price_range") if attraction.get(field))
+        line = f"- **{attraction.get('name', '')}**"
+        if attraction.get("description"):
+            line += f": {attraction['description']}"
+        if details:
+            line += f" ({details})"
+        lines.append(line)
+    lines.append("")
+    lines.append("Would you like more details about any of these?")
+    return "\n".join(lines)
+
+# Renderer and the single tool it needs per intent that can be answered straight from tool data
+DATA_RESPONSE_RENDERERS = {
+    "weather_inquiry": ("weather", render_weather_response),
+    "attractions_inquiry": ("attractions", render_attractions_response)
+}
+
+def render_data_response(intent: str, city: Optional[str], tools_used: List[str], tool_results: Dict[str, Any]) -> Optional[str]:
+    """Deterministic reply for single-tool data lookups, or None when the LLM should answer"""
+    if intent not in DATA_RESPONSE_RENDERERS or not city:
+        return None
+    tool, render = DATA_RESPONSE_RENDERERS[intent]
+    data = tool_results.get(tool)
+    # Mixed queries (several tools) still go through the LLM
+    if tools_used != [tool] or not data:
+        return None
+    try:
+        return render(city, data)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Falling back to LLM for {intent}: {e}")
+        return None
 
-def create_system_prompt(intent: str, city: str, tools_used: List[str], tool_results: Dict[str, Any]) -> str:
-    """Create a comprehensive system prompt based on intent and available data"""
-    
-    base_prompt = """You are CanTrip, an AI Canadian travel assistant. You help users plan trips, discover events, find attractions, and get weather information for Canadian destinations.
+# Recent turns, and characters per turn, of chat history included in the user prompt
+HISTORY_TURN_LIMIT = 6
+HISTORY_CONTENT_LIMIT = 500
+
+def summarize_history(history: List[Any]) -> List[Dict[str, str]]:
+    """Role and truncated content of the most recent history turns"""
+    turns = []
+    for turn in history[-HISTORY_TURN_LIMIT:]:
+        if isinstance(turn, dict):
+            role = turn.get("role", "")
+            content = turn.get("content", turn.get("message", ""))
+        else:
+            role = getattr(turn, "type", "")
+            content = getattr(turn, "content", "")
+        turns.append({"role": role, "content": str(content)[:HISTORY_CONTENT_LIMIT]})
+    return turns
+
+BASE_SYSTEM_PROMPT = """You are CanTrip, an AI Canadian travel assistant. You help users plan trips, discover events, find attractions, and get weather information for Canadian destinations.
 
 You have access to real-time data from multiple sources including Ticketmaster, Eventbrite, OpenWeather, and more. Always use this data to provide accurate, helpful responses.
 
@@ -289,16 +466,15 @@ Guidelines:
 - Format responses clearly with bullet points and sections when appropriate
 - Include practical information like prices, dates, and booking details when available
 """
-    
-    # Add intent-specific instructions
-    if intent == "events_inquiry":
-        events_data = tool_results.get('events', [])
-        base_prompt += f"""
-EVENTS INQUIRY: The user is asking about events in {city or 'a Canadian city'}.
+
+# Tool result key and full system prompt template per intent; {city} and {data} are filled per request
+INTENT_PROMPTS = {
+    "events_inquiry": ("events", BASE_SYSTEM_PROMPT + """
+EVENTS INQUIRY: The user is asking about events in {city}.
 
 IMPORTANT: You MUST use ONLY the real event data provided below. Do NOT make up or invent events. Do NOT use hardcoded dates from previous years.
 
-Available event data: {json.dumps(events_data, indent=2)}
+Available event data: {data}
 
 CRITICAL INSTRUCTIONS:
 - If the event data is empty ([]), you MUST say "No events found for the specified criteria" or "No events are scheduled for this weekend"
@@ -308,153 +484,160 @@ CRITICAL INSTRUCTIONS:
 - Present events with their actual dates, times, prices, and venues from the data
 - Include booking links when available in the data
 - If no events are found, suggest alternative activities like visiting attractions, parks, or markets
-"""
-    
-    elif intent == "weather_inquiry":
-        base_prompt += f"""
-WEATHER INQUIRY: The user is asking about weather in {city or 'a Canadian city'}.
+"""),
+    "weather_inquiry": ("weather", BASE_SYSTEM_PROMPT + """
+WEATHER INQUIRY: The user is asking about weather in {city}.
 
-Available weather data: {json.dumps(tool_results.get('weather', {}), indent=2)}
+Available weather data: {data}
 
 Instructions:
 - Provide current weather conditions with specific temperatures
 - Include forecast information if available
 - Give travel advice based on weather conditions
 - Suggest appropriate clothing and activities
-"""
-    
-    elif intent == "attractions_inquiry":
-        base_prompt += f"""
-ATTRACTIONS INQUIRY: The user is asking about attractions in {city or 'a Canadian city'}.
+"""),
+    "attractions_inquiry": ("attractions", BASE_SYSTEM_PROMPT + """
+ATTRACTIONS INQUIRY: The user is asking about attractions in {city}.
 
-Available attraction data: {json.dumps(tool_results.get('attractions', []), indent=2)}
+Available attraction data: {data}
 
 Instructions:
 - List specific attractions with descriptions
 - Include practical information (hours, prices, locations)
 - Suggest the best attractions to visit
 - Provide tips for visiting
-"""
-    
-    elif intent == "planning_inquiry":
-        base_prompt += f"""
-PLANNING INQUIRY: The user is asking about trip planning for {city or 'a Canadian city'}.
+"""),
+    "planning_inquiry": ("plan", BASE_SYSTEM_PROMPT + """
+PLANNING INQUIRY: The user is asking about trip planning for {city}.
 
-Available planning data: {json.dumps(tool_results.get('plan', {}), indent=2)}
+Available planning data: {data}
 
 Instructions:
 - Provide a structured itinerary or plan
 - Include timing, locations, and activities
 - Consider weather and events in recommendations
 - Suggest budget-friendly options
-"""
-    
-    elif intent == "recommendations_inquiry":
-        base_prompt += f"""
-RECOMMENDATIONS INQUIRY: The user is asking for recommendations for {city or 'a Canadian city'}.
+"""),
+    "recommendations_inquiry": ("recommendations", BASE_SYSTEM_PROMPT + """
+RECOMMENDATIONS INQUIRY: The user is asking for recommendations for {city}.
 
-Available recommendation data: {json.dumps(tool_results.get('recommendations', []), indent=2)}
+Available recommendation data: {data}
 
 Instructions:
 - Provide specific, actionable recommendations
 - Include a mix of popular and unique suggestions
 - Consider the user's interests and preferences
 - Provide practical details for each recommendation
-"""
-    
-    return base_prompt
+""")
+}
 
-def generate_suggestions(intent: str, city: str, tool_results: Dict[str, Any]) -> List[str]:
-    """Generate contextual suggestions based on intent and results"""
-    
-    suggestions = []
+def create_system_prompt(intent: str, city: str, tools_used: List[str], tool_results: Dict[str, Any]) -> str:
+    """Create a comprehensive system prompt based on intent and available data"""
+    if intent not in INTENT_PROMPTS:
+        return BASE_SYSTEM_PROMPT
     
-    if intent == "events_inquiry":
-        suggestions = [
-            f"What concerts are happening in {city}?",
-            f"Are there any sports events in {city}?",
-            f"What festivals are coming up in {city}?",
-            f"Show me family-friendly events in {city}"
-        ]
-    elif intent == "weather_inquiry":
-        suggestions = [
-            f"What's the weather forecast for {city}?",
-            f"What should I pack for {city}?",
-            f"Is it good weather for outdoor activities in {city}?",
-            f"What's the best time to visit {city}?"
-        ]
-    elif intent == "attractions_inquiry":
-        suggestions = [
-            f"What are the must-see attractions in {city}?",
-            f"Show me free attractions in {city}",
-            f"What museums are in {city}?",
-            f"What outdoor attractions are in {city}?"
-        ]
-    elif intent == "planning_inquiry":
-        suggestions = [
-            f"Create a 3-day itinerary for {city}",
-            f"Plan a budget trip to {city}",
-            f"What should I do in {city} this weekend?",
-            f"Plan a family trip to {city}"
-        ]
+    key, template = INTENT_PROMPTS[intent]
+    if key in PROMPT_FIELDS:
+        data = summarize_items(key, tool_results.get(key, []))
     else:
-        suggestions = [
-            f"Tell me about {city}",
-            f"What's the weather like in {city}?",
-            f"What events are happening in {city}?",
-            f"Plan a trip to {city}"
-        ]
-    
-    return suggestions
-
-def detect_city_from_message(message: str) -> Optional[str]:
-    """Detect city from user message"""
-    message_lower = message.lower()
-    
-    canadian_cities = [
-        'toronto', 'vancouver', 'montreal', 'calgary', 'ottawa', 'edmonton',
-        'winnipeg', 'quebec city', 'hamilton', 'kitchener', 'london', 'victoria',
-        'halifax', 'oshawa', 'windsor', 'saskatoon', 'regina', 'sherbrooke',
-        'barrie', 'kelowna', 'abbotsford', 'kingston', 'trois-rivières',
-        'guelph', 'cambridge', 'whitby', 'ajax', 'milton', 'st. catharines',
-        'brantford', 'thunder bay', 'saint john', 'peterborough', 'red deer',
-        'lethbridge', 'kamloops', 'nanaimo', 'prince george', 'chilliwack',
-        'vernon', 'fort mcmurray', 'sarnia', 'belleville', 'charlottetown',
-        'fredericton', 'moncton', 'saint john', 'yellowknife', 'whitehorse',
-        'iqaluit', 'banff', 'whistler', 'niagara falls', 'jasper', 'victoria'
-    ]
-    
-    for city in canadian_cities:
-        if city in message_lower:
-            return city.title()
-    
-    return None
+        data = compact_json(tool_results.get(key, {}))
+    return template.format(city=city or 'a Canadian city', data=data)
+
+# Follow-up prompt templates per intent; other intents use the general set
+SUGGESTION_TEMPLATES = {
+    "events_inquiry": (
+        "What concerts are happening in {city}?",
+        "Are there any sports events in {city}?",
+        "What festivals are coming up in {city}?",
+        "Show me family-friendly events in {city}"
+    ),
+    "weather_inquiry": (
+        "What's the weather forecast for {city}?",
+        "What should I pack for {city}?",
+        "Is it good weather for outdoor activities in {city}?",
+        "What's the best time to visit {city}?"
+    ),
+    "attractions_inquiry": (
+        "What are the must-see attractions in {city}?",
+        "Show me free attractions in {city}",
+        "What museums are in {city}?",
+        "What outdoor attractions are in {city}?"
+    ),
+    "planning_inquiry": (
+        "Create a 3-day itinerary for {city}",
+        "Plan a budget trip to {city}",
+        "What should I do in {city} this weekend?",
+        "Plan a family trip to {city}"
+    ),
+    "general": (
+        "Tell me about {city}",
+        "What's the weather like in {city}?",
+        "What events are happening in {city}?",
+        "Plan a trip to {city}"
+    )
+}
+
+@lru_cache(maxsize=1024)
+def _formatted_suggestions(intent: str, city: Optional[str]) -> Tuple[str, ...]:
+    """Suggestion templates for an intent filled in with the city"""
+    templates = SUGGESTION_TEMPLATES.get(intent, SUGGESTION_TEMPLATES["general"])
+    return tuple(template.format(city=city) for template in templates)
 
-def extract_event_type(message: str) -> Optional[str]:
-    """Extract event type from message"""
-    message_lower = message.lower()
+def generate_suggestions(intent: str, city: str, tool_results: Dict[str, Any]) -> List[str]:
+    """Generate contextual suggestions based on intent and results"""
+    return list(_formatted_suggestions(intent, city))
+
+CANADIAN_CITIES = [
+    'toronto', 'vancouver', 'montreal', 'calgary', 'ottawa', 'edmonton',
+    'winnipeg', 'quebec city', 'hamilton', 'kitchener', 'london', 'victoria',
+    'halifax', 'oshawa', 'windsor', 'saskatoon', 'regina', 'sherbrooke',
+    'barrie', 'kelowna', 'abbotsford', 'kingston', 'trois-rivières',
+    'guelph', 'cambridge', 'whitby', 'ajax', 'milton', 'st. catharines',
+    'brantford', 'thunder bay', 'saint john', 'peterborough', 'red deer',
+    'lethbridge', 'kamloops', 'nanaimo', 'prince george', 'chilliwack',
+    'vernon', 'fort mcmurray', 'sarnia', 'belleville', 'charlottetown',
+    'fredericton', 'moncton', 'yellowknife', 'whitehorse',
+    'iqaluit', 'banff', 'whistler', 'niagara falls', 'jasper'
+]
+
+# Display name per lowercase city
+CITY_NAMES = {city: city.title() for city in CANADIAN_CITIES}
+
+# One scan for all cities as whole words; longer names first so they win at the same position
+CITY_PATTERN = re.compile(
+    r"(?<!\w)(" + "|".join(re.escape(city) for city in sorted(CANADIAN_CITIES, key=len, reverse=True)) + r")(?!\w)"
+)
+
+def detect_city_from_message(message_lower: str) -> Optional[str]:
+    """Detect the first city mentioned in the lowercased user message"""
+    match = CITY_PATTERN.search(message_lower)
+    return CITY_NAMES[match.group(1)] if match else None
+
+def extract_event_type(message_lower: str) -> Optional[str]:
+    """Extract event type from lowercased message"""
     
     # Skip common verbs that might be confused with event types
-    skip_words = ['show me', 'show you', 'show us', 'tell me', 'give me', 'find me']
-    if any(skip_word in message_lower for skip_word in skip_words):
+    found = scan_keywords(message_lower)
+    if ("skip", "") in found:
         return None
     
-    if any(word in message_lower for word in ['concert', 'music', 'band', 'singer']):
-        return 'music'
-    elif any(word in message_lower for word in ['sports', 'game', 'match', 'hockey', 'basketball', 'baseball']):
-        return 'sports'
-    elif any(word in message_lower for word in ['festival', 'fair', 'celebration']):
-        return 'festival'
-    elif any(word in message_lower for word in ['theater', 'theatre', 'play', 'musical', 'drama']):
-        return 'theater'
-    elif any(word in message_lower for word in ['comedy', 'standup', 'joke']):
-        return 'comedy'
+    for _, event_type in EVENT_TYPE_KEYWORDS:
+        if ("event_type", event_type) in found:
+            return event_type
     
     return None
 
-def extract_date(message: str) -> Optional[str]:
-    """Extract date from message"""
-    message_lower = message.lower()
+DATE_PATTERNS = [
+    re.compile(r'(\d{1,2})/(\d{1,2})'),  # MM/DD
+    re.compile(r'(\d{1,2})-(\d{1,2})'),  # MM-DD
+    re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'),  # YYYY-MM-DD
+]
+
+NUMBER_PATTERN = re.compile(r'\d+')
+AMOUNT_PATTERN = re.compile(r'\$?(\d+)')
+
+def extract_date(message_lower: str) -> Optional[str]:
+    """Extract date from lowercased message"""
     
     # Get current date
     today = datetime.now()
@@ -484,15 +667,8 @@ def extract_date(message: str) -> Optional[str]:
         return today.strftime("%Y-%m-%d")
     
     # Try to extract specific dates (MM/DD, MM-DD, etc.)
-    import re
-    date_patterns = [
-        r'(\d{1,2})/(\d{1,2})',  # MM/DD
-        r'(\d{1,2})-(\d{1,2})',  # MM-DD
-        r'(\d{4})-(\d{1,2})-(\d{1,2})',  # YYYY-MM-DD
-    ]
-    
-    for pattern in date_patterns:
-        match = re.search(pattern, message)
+    for pattern in DATE_PATTERNS:
+        match = pattern.search(message_lower)
         if match:
             if len(match.groups()) == 2:  # MM/DD or MM-DD
                 month, day = match.groups()
@@ -512,9 +688,8 @@ def extract_date(message: str) -> Optional[str]:
     
     return None
 
-def extract_duration(message: str) -> int:
-    """Extract trip duration from message"""
-    message_lower = message.lower()
+def extract_duration(message_lower: str) -> int:
+    """Extract trip duration from lowercased message"""
     
     if 'weekend' in message_lower or '2 days' in message_lower:
         return 2
@@ -524,16 +699,14 @@ def extract_duration(message: str) -> int:
         return 30
     elif any(word in message_lower for word in ['day', 'days']):
         # Try to extract number
-        import re
-        numbers = re.findall(r'\d+', message)
-        if numbers:
-            return int(numbers[0])
+        number = NUMBER_PATTERN.search(message_lower)
+        if number:
+            return int(number.group())
     
     return 3  # Default
 
-def extract_budget(message: str) -> float:
-    """Extract budget from message"""
-    message_lower = message.lower()
+def extract_budget(message_lower: str) -> float:
+    """Extract budget from lowercased message"""
     
     if 'budget' in message_lower or 'cheap' in message_lower:
         return 500.0
@@ -543,85 +716,120 @@ def extract_budget(message: str) -> float:
         return 1500.0
     
     # Try to extract dollar amount
-    import re
-    amounts = re.findall(r'\$?(\d+)', message)
-    if amounts:
-        return float(amounts[0])
+    amount = AMOUNT_PATTERN.search(message_lower)
+    if amount:
+        return float(amount.group(1))
     
     return 1000.0  # Default
 
-def extract_interests(message: str) -> List[str]:
-    """Extract interests from message"""
-    message_lower = message.lower()
-    interests = []
-    
-    interest_keywords = {
-        'music': ['music', 'concert', 'band', 'singer'],
-        'sports': ['sports', 'game', 'hockey', 'basketball', 'baseball'],
-        'arts': ['art', 'museum', 'gallery', 'theater', 'theatre'],
-        'food': ['food', 'restaurant', 'dining', 'cuisine'],
-        'outdoor': ['outdoor', 'hiking', 'park', 'nature', 'beach'],
-        'culture': ['culture', 'cultural', 'history', 'heritage'],
-        'family': ['family', 'kids', 'children'],
-        'nightlife': ['nightlife', 'bar', 'club', 'drinks']
-    }
+def extract_interests(message_lower: str) -> List[str]:
+    """Extract interests from lowercased message"""
     
-    for interest, keywords in interest_keywords.items():
-        if any(keyword in message_lower for keyword in keywords):
-            interests.append(interest)
-    
-    return interests
+    found = scan_keywords(message_lower)
+    return [interest for interest in INTEREST_KEYWORDS if ("interest", interest) in found]
+
+async def warmup_model():
+    """Build the response LLM client and make one tiny call so the first user
+    request doesn't pay for credential lookup and connection setup"""
+    try:
+        chat_llm = await asyncio.to_thread(model_router.get_model_for_agent, "explore", prompt_text="ping")
+        await chat_llm.ainvoke([HumanMessage(content="Reply with OK.")])
+        logger.info("Response LLM warmed up")
+    except Exception as e:
+        logger.warning(f"LLM warmup failed: {e}")
+
+@lru_cache(maxsize=1)
+def get_compiled_enhanced_graph():
+    """The compiled enhanced graph, built once per process and shared by all runs"""
+    return create_enhanced_travel_graph().compile()
 
 class EnhancedTravelPlanningGraph:
     """Enhanced travel planning graph with tool integration"""
     
     def __init__(self):
-        self.graph = create_enhanced_travel_graph()
-        self.app = self.graph.compile()
+        self.app = get_compiled_enhanced_graph()
+    
+    @staticmethod
+    def _initial_state(input_data: Dict[str, Any]) -> EnhancedTravelState:
+        """Initial graph state with defaults; caller-owned containers are copied so
+        concurrent runs never share mutable state"""
+        return {
+            "message": input_data.get("message", ""),
+            "message_lower": "",
+            "session_id": input_data.get("session_id", ""),
+            "context": dict(input_data.get("context") or {}),
+            "history": list(input_data.get("history") or []),
+            "response": "",
+            "intent": "",
+            "confidence": 0.0,
+            "suggestions": [],
+            "data": {},
+            "tools_used": [],
+            "city_detected": None
+        }
+    
+    @staticmethod
+    def _build_response(result: Dict[str, Any]) -> Dict[str, Any]:
+        """API response for a finished graph state"""
+        return {
+            "response": result.get("response", "I'm here to help with your travel planning!"),
+            "session_id": result.get("session_id", ""),
+            "intent": result.get("intent", "general"),
+            "confidence": result.get("confidence", 0.8),
+            "suggestions": result.get("suggestions", []),
+            "data": result.get("data", {}),
+            "tools_used": result.get("tools_used", []),
+            "city_detected": result.get("city_detected"),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def _fallback_response(input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """API response used when the graph fails"""
+        return {
+            "response": "I'm here to help with your travel planning! What would you like to know?",
+            "session_id": input_data.get("session_id", ""),
+            "intent": "general",
+            "confidence": 0.5,
+            "suggestions": ["Tell me about popular Canadian destinations"],
+            "data": {},
+            "tools_used": [],
+            "city_detected": None,
+            "timestamp": datetime.now().isoformat()
+        }
     
     async def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Run the enhanced travel planning graph"""
         try:
-            # Create initial state with defaults
-            state = {
-                "message": input_data.get("message", ""),
-                "session_id": input_data.get("session_id", ""),
-                "context": input_data.get("context", {}),
-                "history": input_data.get("history", []),
-                "response": "",
-                "intent": "",
-                "confidence": 0.0,
-                "suggestions": [],
-                "data": {},
-                "tools_used": [],
-                "city_detected": None
-            }
-            
-            # Run the graph
-            result = await self.app.ainvoke(state)
-            
-            return {
-                "response": result.get("response", "I'm here to help with your travel planning!"),
-                "session_id": result.get("session_id", ""),
-                "intent": result.get("intent", "general"),
-                "confidence": result.get("confidence", 0.8),
-                "suggestions": result.get("suggestions", []),
-                "data": result.get("data", {}),
-                "tools_used": result.get("tools_used", []),
-                "city_detected": result.get("city_detected"),
-                "timestamp": datetime.now().isoformat()
-            }
+            result = await self.app.ainvoke(self._initial_state(input_data))
+            return self._build_response(result)
                 
         except Exception as e:
             logger.error(f"Error running enhanced travel planning graph: {e}")
-            return {
-                "response": "I'm here to help with your travel planning! What would you like to know?",
-                "session_id": input_data.get("session_id", ""),
-                "intent": "general",
-                "confidence": 0.5,
-                "suggestions": ["Tell me about popular Canadian destinations"],
-                "data": {},
-                "tools_used": [],
-                "city_detected": None,
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._fallback_response(input_data)
+    
+    async def stream(self, input_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Run the enhanced graph, yielding the answer as the LLM produces it.
+        
+        Yields {"type": "token", "content": ...} for each response delta from
+        generate_response, then {"type": "result", "data": ...} with the same
+        payload run() returns.
+        """
+        result = {}
+        try:
+            async for mode, payload in self.app.astream(
+                    self._initial_state(input_data), stream_mode=["messages", "values"]):
+                if mode == "messages":
+                    chunk, metadata = payload
+                    if metadata.get("langgraph_node") == "generate_response" and isinstance(chunk.content, str) and chunk.content:
+                        yield {"type": "token", "content": chunk.content}
+                else:
+                    result = payload
+            
+            response = self._build_response(result)
+            
+        except Exception as e:
+            logger.error(f"Error streaming enhanced travel planning graph: {e}")
+            response = self._fallback_response(input_data)
+        
+        yield {"type": "result", "data": response}
@@ -5,10 +5,15 @@ A working version that handles chat requests properly
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
+import re
+import time
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, TypedDict
 from langchain_core.messages import HumanMessage, AIMessage
 from langgraph.graph import StateGraph, END
@@ -19,6 +24,11 @@ from model_router import model_router
 
 logger = logging.getLogger(__name__)
 
+# Chat LLM calls in flight per process; further requests wait here rather than
+# piling onto the Vertex AI quota and failing with rate-limit errors
+MAX_CONCURRENT_CHAT_CALLS = int(os.getenv("MAX_CONCURRENT_CHAT_CALLS", "16"))
+_chat_call_slots = asyncio.Semaphore(MAX_CONCURRENT_CHAT_CALLS)
+
 class TravelState(TypedDict):
     """State for travel planning"""
     message: str
@@ -30,6 +40,81 @@ class TravelState(TypedDict):
     confidence: float
     suggestions: List[str]
 
+# Chat responses are reused for identical conversations; fallback (error) responses
+# only briefly so a Vertex AI outage isn't retried on every repeat
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+ERROR_RESPONSE_CACHE_TTL = 30
+RESPONSE_CACHE_SIZE = 512
+
+def chat_cache_key(input_data: Dict[str, Any]) -> str:
+    """Digest of the message (case- and whitespace-insensitive), context, and history"""
+    canonical = json.dumps({
+        "message": " ".join(input_data.get("message", "").lower().split()),
+        "context": input_data.get("context") or {},
+        "history": input_data.get("history") or []
+    }, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+# Chat prompt for travel planning; only the message, context, and history vary per request
+CHAT_PROMPT = """You are a helpful Canadian travel assistant. The user has sent this message: "{message}"
+
+Context: {context}
+History: {history}
+
+Please provide a helpful, detailed response about Canadian travel. If they're asking about:
+- Trip planning: Offer specific suggestions and ask for more details
+- Destinations: Provide interesting facts and recommendations
+- Activities: Suggest popular Canadian activities
+- Weather: Mention seasonal considerations
+- General questions: Be friendly and helpful
+
+Keep your response conversational and helpful. Ask follow-up questions to better understand their needs.
+"""
+
+# Intent keywords in priority order; the first intent with a matching keyword wins
+INTENT_KEYWORDS = [
+    ("trip_planning", ['plan', 'trip', 'visit', 'go to']),
+    ("weather_inquiry", ['weather', 'temperature', 'climate']),
+    ("packing_request", ['pack', 'packing', 'bring']),
+    ("itinerary_request", ['itinerary', 'schedule', 'plan']),
+]
+INTENT_PRIORITY = {intent: rank for rank, (intent, _) in enumerate(INTENT_KEYWORDS)}
+
+# Keyword -> highest-priority intent it signals
+KEYWORD_INTENTS = {word: intent for intent, words in reversed(INTENT_KEYWORDS) for word in words}
+
+# One pass over the message reporting the longest keyword at each position; shorter
+# keywords sharing that start ("pack" in "packing") signal the same intent
+INTENT_KEYWORD_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(word) for word in sorted(KEYWORD_INTENTS, key=len, reverse=True)) + "))"
+)
+
+# Follow-up prompts per intent; shared immutable tuples, serialized as JSON arrays
+INTENT_SUGGESTIONS = {
+    "trip_planning": (
+        "Tell me about popular Canadian destinations",
+        "Help me plan a trip to Toronto",
+        "What's the weather like in Vancouver?",
+        "I need a budget-friendly trip to Montreal"
+    ),
+    "weather_inquiry": (
+        "What's the weather in Toronto?",
+        "How's the weather in Vancouver?",
+        "Weather forecast for Montreal",
+        "Best time to visit Canada?"
+    )
+}
+DEFAULT_SUGGESTIONS = (
+    "Tell me about popular Canadian destinations",
+    "Help me plan a trip to Toronto",
+    "What's the weather like in Vancouver?"
+)
+
+def detect_intent(message: str) -> str:
+    """Highest-priority intent whose keywords occur in the message"""
+    found = {KEYWORD_INTENTS[match.group(1)] for match in INTENT_KEYWORD_PATTERN.finditer(message.lower())}
+    return min(found, key=INTENT_PRIORITY.__getitem__, default="general_question")
+
 def create_simple_travel_graph() -> StateGraph:
     """Create a simple travel planning graph"""
     
@@ -62,58 +147,17 @@ async def process_chat_node(state: TravelState) -> TravelState:
         chat_llm = model_router.get_model_for_agent("explore", prompt_text=message)
         
         # Create a comprehensive prompt for travel planning
-        prompt = f"""
-        You are a helpful Canadian travel assistant. The user has sent this message: "{message}"
-        
-        Context: {context}
-        History: {history}
-        
-        Please provide a helpful, detailed response about Canadian travel. If they're asking about:
-        - Trip planning: Offer specific suggestions and ask for more details
-        - Destinations: Provide interesting facts and recommendations
-        - Activities: Suggest popular Canadian activities
-        - Weather: Mention seasonal considerations
-        - General questions: Be friendly and helpful
-        
-        Keep your response conversational and helpful. Ask follow-up questions to better understand their needs.
-        """
+        prompt = CHAT_PROMPT.format(message=message, context=context, history=history)
         
         # Get response from LLM
-        response = await chat_llm.ainvoke([HumanMessage(content=prompt)])
+        async with _chat_call_slots:
+            response = await chat_llm.ainvoke([HumanMessage(content=prompt)])
         
         # Analyze intent (simplified)
-        if any(word in message.lower() for word in ['plan', 'trip', 'visit', 'go to']):
-            intent = "trip_planning"
-        elif any(word in message.lower() for word in ['weather', 'temperature', 'climate']):
-            intent = "weather_inquiry"
-        elif any(word in message.lower() for word in ['pack', 'packing', 'bring']):
-            intent = "packing_request"
-        elif any(word in message.lower() for word in ['itinerary', 'schedule', 'plan']):
-            intent = "itinerary_request"
-        else:
-            intent = "general_question"
+        intent = detect_intent(message)
         
         # Generate suggestions based on intent
-        if intent == "trip_planning":
-            suggestions = [
-                "Tell me about popular Canadian destinations",
-                "Help me plan a trip to Toronto", 
-                "What's the weather like in Vancouver?",
-                "I need a budget-friendly trip to Montreal"
-            ]
-        elif intent == "weather_inquiry":
-            suggestions = [
-                "What's the weather in Toronto?",
-                "How's the weather in Vancouver?", 
-                "Weather forecast for Montreal",
-                "Best time to visit Canada?"
-            ]
-        else:
-            suggestions = [
-                "Tell me about popular Canadian destinations",
-                "Help me plan a trip to Toronto",
-                "What's the weather like in Vancouver?"
-            ]
+        suggestions = INTENT_SUGGESTIONS.get(intent, DEFAULT_SUGGESTIONS)
         
         # Update state
         state["response"] = response.content
@@ -140,15 +184,61 @@ async def finalize_response_node(state: TravelState) -> TravelState:
     
     return state
 
+@lru_cache(maxsize=1)
+def get_compiled_simple_graph():
+    """The compiled simple graph, built once per process and shared by all runs"""
+    return create_simple_travel_graph().compile()
+
 class SimpleTravelPlanningGraph:
     """Simple travel planning graph"""
     
     def __init__(self):
-        self.graph = create_simple_travel_graph()
-        self.app = self.graph.compile()
+        self.app = get_compiled_simple_graph()
+        
+        # Response cache: key -> (expiry time, result), least recently used first
+        self._response_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        
+        # In-flight graph runs by cache key, so identical concurrent requests share one LLM call
+        self._inflight: Dict[str, "asyncio.Task"] = {}
+    
+    def _cached_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result for a key with a fresh timestamp, or None if missing or expired"""
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._response_cache[key]
+            return None
+        self._response_cache.move_to_end(key)
+        return {**result, "timestamp": datetime.now().isoformat()}
+    
+    def _store_response(self, key: str, result: Dict[str, Any], ttl: int):
+        """Cache a result, evicting the least recently used entries"""
+        self._response_cache[key] = (time.monotonic() + ttl, result)
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
     
     async def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Run the travel planning graph"""
+        key = chat_cache_key(input_data)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return {**cached, "session_id": input_data.get("session_id", "")}
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_graph(key, input_data))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shielded so one caller disconnecting does not cancel the run for the others
+        response = await asyncio.shield(task)
+        return {**response, "session_id": input_data.get("session_id", "")}
+    
+    async def _run_graph(self, key: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the graph once and cache the response"""
         try:
             # Create initial state with defaults
             state = {
@@ -165,7 +255,7 @@ class SimpleTravelPlanningGraph:
             # Run the graph
             result = await self.app.ainvoke(state)
             
-            return {
+            response = {
                 "response": result.get("response", "I'm here to help with your travel planning!"),
                 "session_id": result.get("session_id", ""),
                 "intent": result.get("intent", "general"),
@@ -174,10 +264,14 @@ class SimpleTravelPlanningGraph:
                 "data": {},
                 "timestamp": datetime.now().isoformat()
             }
+            # process_chat_node reports LLM failures as a low-confidence fallback
+            ttl = RESPONSE_CACHE_TTL if response["confidence"] > 0.5 else ERROR_RESPONSE_CACHE_TTL
+            self._store_response(key, response, ttl)
+            return response
                 
         except Exception as e:
             logger.error(f"Error running travel planning graph: {e}")
-            return {
+            response = {
                 "response": "I'm here to help with your travel planning! What would you like to know?",
                 "session_id": input_data.get("session_id", ""),
                 "intent": "general",
@@ -186,3 +280,6 @@ class SimpleTravelPlanningGraph:
                 "data": {},
                 "timestamp": datetime.now().isoformat()
             }
+            # Cached briefly so repeated failures don't re-run the graph on every retry
+            self._store_response(key, response, ERROR_RESPONSE_CACHE_TTL)
+            return response
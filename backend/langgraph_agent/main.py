@@ -10,21 +10,28 @@ import logging
 import os
 import sys
 from typing import Dict, Any, List, Optional
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 import asyncio
 
+# Prefer orjson for encoding streamed chat events, fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from graph_enhanced import EnhancedTravelPlanningGraph
+from graph_enhanced import EnhancedTravelPlanningGraph, warmup_model
 from tools.recommend import RecommendationTool
 from tools.events import EventsTool
 from tools.attractions import AttractionsTool
 from tools.planner import PlanningTool
 from eval.phoenix_adapter import PhoenixAdapter
+from tools.http_session import close_session
 
 # Configure logging
 logging.basicConfig(
@@ -46,6 +53,23 @@ travel_graph = EnhancedTravelPlanningGraph()
 # Initialize Phoenix evaluation
 phoenix_adapter = PhoenixAdapter()
 
+@app.on_event("startup")
+async def warm_up_llm():
+    """Warm up the LLM client in the background so startup isn't delayed"""
+    if os.getenv("LLM_WARMUP", "true").lower() == "true":
+        app.state.warmup_task = asyncio.create_task(warmup_model())
+
+@app.on_event("shutdown")
+async def close_http_session():
+    """Release the tools' shared HTTP connection pool"""
+    await close_session()
+
+def sse_event(payload: Dict[str, Any]) -> bytes:
+    """Encode a payload as one server-sent event"""
+    if orjson is not None:
+        return b"data: " + orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+    return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
 class ItineraryRequest(BaseModel):
     city: str
     start_date: str
@@ -85,7 +109,7 @@ async def health_check():
     return {"status": "healthy", "service": "CanTrip LangGraph Agent"}
 
 @app.post("/generate-itinerary")
-async def generate_itinerary(request: ItineraryRequest):
+async def generate_itinerary(request: ItineraryRequest, background_tasks: BackgroundTasks):
     """Generate a complete travel itinerary"""
     import time
     start_time = time.time()
@@ -120,9 +144,10 @@ async def generate_itinerary(request: ItineraryRequest):
             }
         }
         
-        # Evaluate performance with Phoenix
+        # Evaluate performance with Phoenix after the response is sent
         execution_time = time.time() - start_time
-        await phoenix_adapter.evaluate_itinerary_generation(
+        background_tasks.add_task(
+            phoenix_adapter.evaluate_itinerary_generation,
             request=graph_input,
             response=response,
             execution_time=execution_time
@@ -135,7 +160,7 @@ async def generate_itinerary(request: ItineraryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/explore-destination")
-async def explore_destination(request: ExploreRequest):
+async def explore_destination(request: ExploreRequest, background_tasks: BackgroundTasks):
     """Generate travel suggestions based on mood and interests"""
     import time
     start_time = time.time()
@@ -168,9 +193,10 @@ async def explore_destination(request: ExploreRequest):
             }
         }
         
-        # Evaluate performance with Phoenix
+        # Evaluate performance with Phoenix after the response is sent
         execution_time = time.time() - start_time
-        await phoenix_adapter.evaluate_exploration(
+        background_tasks.add_task(
+            phoenix_adapter.evaluate_exploration,
             request=graph_input,
             response=response,
             execution_time=execution_time
@@ -229,34 +255,41 @@ async def chat_stream_endpoint(request: ChatRequest):
                 "task": "chat"
             }
             
-            # Run the graph
-            result = await travel_graph.run(graph_input)
-            response_text = result.get("response", "I'm here to help with your travel planning!")
+            # Forward response tokens as the LLM produces them
+            result = {}
+            streamed = False
+            async for event in travel_graph.stream(graph_input):
+                if event["type"] == "token":
+                    streamed = True
+                    chunk = {
+                        "type": "token",
+                        "content": event["content"],
+                        "session_id": request.session_id
+                    }
+                    yield sse_event(chunk)
+                else:
+                    result = event["data"]
             
-            # Stream the response word by word
-            words = response_text.split()
-            for i, word in enumerate(words):
-                # Create a chunk with the word and metadata
+            # Responses rendered without the LLM (or fallbacks) arrive whole
+            if not streamed:
                 chunk = {
                     "type": "token",
-                    "content": word + (" " if i < len(words) - 1 else ""),
-                    "session_id": request.session_id,
-                    "intent": result.get("intent", "general"),
-                    "confidence": result.get("confidence", 0.8),
-                    "timestamp": result.get("timestamp")
+                    "content": result.get("response", "I'm here to help with your travel planning!"),
+                    "session_id": request.session_id
                 }
-                
-                yield f"data: {json.dumps(chunk)}\n\n"
-                await asyncio.sleep(0.05)  # Small delay to simulate streaming
+                yield sse_event(chunk)
             
             # Send final metadata
             final_chunk = {
                 "type": "done",
+                "intent": result.get("intent", "general"),
+                "confidence": result.get("confidence", 0.8),
                 "suggestions": result.get("suggestions", []),
                 "data": result.get("data", {}),
-                "session_id": request.session_id
+                "session_id": request.session_id,
+                "timestamp": result.get("timestamp")
             }
-            yield f"data: {json.dumps(final_chunk)}\n\n"
+            yield sse_event(final_chunk)
             
         except Exception as e:
             logger.error(f"Error processing streaming chat message: {str(e)}")
@@ -265,7 +298,7 @@ async def chat_stream_endpoint(request: ChatRequest):
                 "content": "I'm sorry, I'm having trouble connecting right now. Please try again in a moment.",
                 "session_id": request.session_id
             }
-            yield f"data: {json.dumps(error_chunk)}\n\n"
+            yield sse_event(error_chunk)
     
     return StreamingResponse(
         generate_stream(),
@@ -278,7 +311,7 @@ async def chat_stream_endpoint(request: ChatRequest):
     )
 
 @app.post("/generate-packing-list")
-async def generate_packing_list(request: PackingRequest):
+async def generate_packing_list(request: PackingRequest, background_tasks: BackgroundTasks):
     """Generate a personalized packing list"""
     import time
     start_time = time.time()
@@ -313,9 +346,10 @@ async def generate_packing_list(request: PackingRequest):
             }
         }
         
-        # Evaluate performance with Phoenix
+        # Evaluate performance with Phoenix after the response is sent
         execution_time = time.time() - start_time
-        await phoenix_adapter.evaluate_packing_list_generation(
+        background_tasks.add_task(
+            phoenix_adapter.evaluate_packing_list_generation,
             request=graph_input,
             response=response,
             execution_time=execution_time
@@ -471,8 +505,13 @@ if __name__ == "__main__":
     # Run the FastAPI server
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8001,
-        reload=True,
+        host=os.getenv("AGENT_HOST", "0.0.0.0"),
+        port=int(os.getenv("AGENT_PORT", "8001")),
+        # uvloop and httptools ship with uvicorn[standard]; name them so a
+        # missing install fails loudly instead of falling back to asyncio/h11
+        loop="uvloop",
+        http="httptools",
+        # The reloader adds a file-watching supervisor process; dev only
+        reload=os.getenv("UVICORN_RELOAD", "false").lower() == "true",
         log_level="info"
     ) 
\ No newline at end of file
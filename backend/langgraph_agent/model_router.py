@@ -6,6 +6,7 @@ Intelligently routes requests to appropriate Gemini models based on complexity
 
 import os
 import logging
+import threading
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 from langchain_google_vertexai import ChatVertexAI
@@ -59,12 +60,41 @@ class ModelRouter:
             "tips": self.flash_model,
             "events": self.flash_model,
             "formatter": self.flash_lite_model,
-            "pdf": self.flash_lite_model
+            "pdf": self.flash_lite_model,
+            "intent": self.flash_lite_model
+        }
+        
+        # Per-agent temperature overrides (deterministic classification)
+        self.agent_temperatures = {
+            "intent": 0.0
         }
         
         # Google Cloud settings
         self.project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
         self.location = os.getenv("VERTEX_AI_LOCATION", "us-central1")
+        
+        # Constructed clients keyed by (model name, temperature, max tokens); building one
+        # resolves credentials, so reuse them across requests
+        self._clients: Dict[tuple, ChatVertexAI] = {}
+        self._clients_lock = threading.Lock()
+    
+    def _get_client(self, model_config: ModelConfig, temperature: float) -> ChatVertexAI:
+        """Shared ChatVertexAI client for a model configuration, built on first use"""
+        key = (model_config.name, temperature, model_config.max_tokens)
+        client = self._clients.get(key)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = ChatVertexAI(
+                        model_name=model_config.name,
+                        project=self.project_id,
+                        location=self.location,
+                        temperature=temperature,
+                        max_output_tokens=model_config.max_tokens,
+                    )
+                    self._clients[key] = client
+        return client
     
     def estimate_tokens(self, text: str) -> int:
         """Estimate token count from text (4 chars ≈ 1 token)"""
@@ -131,15 +161,9 @@ class ModelRouter:
         
         # Get model configuration
         model_config = self.models[model_name]
+        temperature = self.agent_temperatures.get(agent_type, model_config.temperature)
         
-        # Create and return the model
-        return ChatVertexAI(
-            model_name=model_config.name,
-            project=self.project_id,
-            location=self.location,
-            temperature=model_config.temperature,
-            max_output_tokens=model_config.max_tokens,
-        )
+        return self._get_client(model_config, temperature)
     
     def get_model_by_name(self, model_name: str) -> ChatVertexAI:
         """Get model by specific name"""
@@ -149,13 +173,7 @@ class ModelRouter:
         
         model_config = self.models[model_name]
         
-        return ChatVertexAI(
-            model_name=model_config.name,
-            project=self.project_id,
-            location=self.location,
-            temperature=model_config.temperature,
-            max_output_tokens=model_config.max_tokens,
-        )
+        return self._get_client(model_config, model_config.temperature)
 
 # Global router instance
 model_router = ModelRouter() 
\ No newline at end of file
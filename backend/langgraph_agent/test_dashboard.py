@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the evaluation dashboard log readers
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+pytest.importorskip("flask")
+
+from eval import dashboard
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = str(tmp_path / "evaluations.jsonl")
+    yield path
+    dashboard._TAIL_STATE.pop(path, None)
+    dashboard._TAIL_LOCKS.pop(path, None)
+
+def append_records(path, records, mode="a"):
+    with open(path, mode) as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+def read_tail(path):
+    return dashboard._read_log_tail(path, os.stat(path))
+
+def test_log_tail_appends(log_path):
+    append_records(log_path, [{"n": 0}, {"n": 1}])
+    assert read_tail(log_path) == [{"n": 0}, {"n": 1}]
+    
+    append_records(log_path, [{"n": 2}])
+    assert read_tail(log_path) == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+def test_log_tail_keeps_partial_line_for_next_read(log_path):
+    append_records(log_path, [{"n": 0}])
+    with open(log_path, "a") as f:
+        f.write('{"n": ')
+    assert read_tail(log_path) == [{"n": 0}]
+    
+    with open(log_path, "a") as f:
+        f.write('1}\n')
+    assert read_tail(log_path) == [{"n": 0}, {"n": 1}]
+
+def test_log_tail_rotation_and_truncation(log_path, tmp_path):
+    append_records(log_path, [{"n": 0}, {"n": 1}])
+    assert len(read_tail(log_path)) == 2
+    
+    # Rotation: the file is moved aside and a new one starts at the same path
+    os.replace(log_path, str(tmp_path / "evaluations.1.jsonl"))
+    append_records(log_path, [{"n": 2}])
+    assert read_tail(log_path) == [{"n": 2}]
+    
+    # Truncation in place: same inode, smaller size
+    append_records(log_path, [], mode="w")
+    assert read_tail(log_path) == []
+    append_records(log_path, [{"n": 3}])
+    assert read_tail(log_path) == [{"n": 3}]
+
+def test_log_tail_concurrent_reads(log_path):
+    expected = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for n in range(50):
+            append_records(log_path, [{"n": n}])
+            expected.append({"n": n})
+            # Concurrent requests refreshing the same file must not append a record twice
+            st = os.stat(log_path)
+            list(executor.map(lambda _: dashboard._read_log_tail(log_path, st), range(4)))
+    assert read_tail(log_path) == expected
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(dashboard, "LOG_DIRS", (str(tmp_path),))
+    yield tmp_path
+    for path in list(dashboard._TAIL_STATE):
+        if path.startswith(str(tmp_path)):
+            dashboard._TAIL_STATE.pop(path, None)
+            dashboard._TAIL_LOCKS.pop(path, None)
+    dashboard._GLOB_CACHE.pop(str(tmp_path), None)
+
+def evaluation(task, success, seconds, timestamp):
+    return {"task": task, "timestamp": timestamp,
+            "metrics": {"success": success, "execution_time_seconds": seconds}}
+
+def test_generation_is_replaced_not_mutated(log_dir):
+    path = str(log_dir / "evaluations.jsonl")
+    append_records(path, [evaluation("exploration", True, 1.0, "2024-01-01T00:00:00")])
+    old = dashboard._load_generation()
+    assert dashboard._generation_stats(old)["total_evaluations"] == 1
+    
+    append_records(path, [evaluation("packing_list_generation", False, 3.0, "2024-01-02T00:00:00")])
+    new = dashboard._load_generation()
+    assert new is not old
+    assert new["etag"] != old["etag"]
+    # A request still holding the old generation fills values into it, not the new one
+    assert "stats" not in new and old["stats"]["total_evaluations"] == 1
+    assert dashboard.load_stats() == {
+        "total_evaluations": 2, "success_rate": 0.5, "avg_execution_time": 2.0, "tasks_count": 2
+    }
+    assert [e["task"] for e in dashboard.load_evaluations()] == ["packing_list_generation", "exploration"]
+
+def test_api_stats_etag(log_dir):
+    append_records(str(log_dir / "evaluations.jsonl"), [evaluation("exploration", True, 1.0, "2024-01-01T00:00:00")])
+    client = dashboard.app.test_client()
+    response = client.get("/api/stats")
+    assert response.status_code == 200
+    assert response.get_json()["total_evaluations"] == 1
+    
+    cached = client.get("/api/stats", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
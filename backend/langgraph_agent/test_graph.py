@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the travel planning graph
+"""
+
+import time
+import pytest
+
+pytest.importorskip("langgraph")
+
+import graph
+from tools import cache
+
+@pytest.fixture(autouse=True)
+def empty_tool_cache():
+    cache._tool_cache.clear()
+    yield
+    cache._tool_cache.clear()
+
+@pytest.fixture
+def tool_calls(monkeypatch):
+    calls = []
+    
+    async def get_events(city, date=None, category=None):
+        calls.append(("events", city))
+        return [{"name": "Jazz Festival"}]
+    
+    async def get_attractions(city, category="all"):
+        calls.append(("attractions", city))
+        return [{"name": "Old Port", "source": cache.FALLBACK_SOURCE}]
+    
+    monkeypatch.setattr(graph.events_tool, "get_events", get_events)
+    monkeypatch.setattr(graph.attractions_tool, "get_attractions", get_attractions)
+    return calls
+
+@pytest.mark.asyncio
+async def test_lookups_accept_null_city(tool_calls):
+    update = await graph.get_events_and_attractions_node({"city": None})
+    assert update["events"] == [{"name": "Jazz Festival"}]
+    assert tool_calls == [("events", ""), ("attractions", "")]
+
+@pytest.mark.asyncio
+async def test_lookups_reuse_tool_cache(tool_calls):
+    await graph.get_events_and_attractions_node({"city": "Montreal"})
+    await graph.get_events_and_attractions_node({"city": " Montreal "})
+    assert tool_calls == [("events", "Montreal"), ("attractions", "Montreal")]
+    
+    # Fallback attractions are kept only for the short fallback TTL
+    now = cache.time.monotonic()
+    events_expiry, _ = cache._tool_cache[("events", "Montreal", None, None)]
+    attractions_expiry, _ = cache._tool_cache[("attractions", "Montreal")]
+    assert events_expiry - now > cache.TOOL_FALLBACK_CACHE_TTL
+    assert attractions_expiry - now <= cache.TOOL_FALLBACK_CACHE_TTL
+
+class FakeApp:
+    """Stands in for the compiled graph, counting invocations"""
+    
+    def __init__(self, update):
+        self.calls = 0
+        self.update = update
+    
+    async def ainvoke(self, state):
+        self.calls += 1
+        return {**state, **self.update}
+
+def expires_in(travel_graph, input_data):
+    expires_at, _ = travel_graph._response_cache[graph.response_cache_key(input_data)]
+    return expires_at - time.monotonic()
+
+EXPLORE = {"task": "explore_destination", "city": "Montreal", "mood": "relaxed"}
+
+@pytest.mark.asyncio
+async def test_identical_requests_use_response_cache():
+    travel_graph = graph.TravelPlanningGraph()
+    travel_graph.app = FakeApp({"suggestions": [{"title": "Old Port"}]})
+    
+    first = await travel_graph.run(EXPLORE)
+    # Case and whitespace differences normalise to the same key
+    second = await travel_graph.run({**EXPLORE, "city": "  montreal "})
+    assert travel_graph.app.calls == 1
+    assert second["suggestions"] == first["suggestions"]
+    assert expires_in(travel_graph, EXPLORE) > graph.ERROR_RESPONSE_CACHE_TTL
+
+@pytest.mark.asyncio
+async def test_empty_task_payload_cached_briefly():
+    travel_graph = graph.TravelPlanningGraph()
+    travel_graph.app = FakeApp({"suggestions": []})
+    
+    await travel_graph.run(EXPLORE)
+    assert expires_in(travel_graph, EXPLORE) <= graph.ERROR_RESPONSE_CACHE_TTL
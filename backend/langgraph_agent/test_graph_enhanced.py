@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the enhanced travel planning graph
+"""
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from graph_enhanced import (
+    classify_message, extract_event_type, extract_interests, render_data_response, scan_keywords
+)
+from tools.cache import FALLBACK_SOURCE
+
+def tools_found(message_lower):
+    """Tools whose keywords scan_keywords reports for a message"""
+    return {label for kind, label in scan_keywords(message_lower) if kind == "tool"}
+
+def test_scan_reports_every_keyword_kind():
+    message = "hockey game and a museum visit with the kids"
+    found = scan_keywords(message)
+    assert {"events", "attractions", "planner"} <= tools_found(message)
+    assert ("event_type", "sports") in found
+    assert ("interest", "sports") in found
+    assert ("interest", "arts") in found
+    assert ("interest", "family") in found
+
+def test_multi_word_phrases():
+    assert "events" in tools_found("what is on this weekend")
+    assert "recommendations" in tools_found("where to eat")
+    assert "planner" in tools_found("i want to go to banff")
+
+def test_keywords_match_whole_words():
+    # "photo" contains "hot", "train" contains "rain", "party" contains "art"
+    assert "weather" not in tools_found("can i take a photo of the cn tower")
+    assert "weather" not in tools_found("is the train on time")
+    assert ("interest", "arts") not in scan_keywords("a birthday party")
+    assert "weather" in tools_found("will it be hot tomorrow")
+    assert classify_message("take a photo in toronto") == (
+        "general_city_inquiry", ("recommendations", "attractions"), "Toronto")
+
+def test_plural_keywords_match_singular():
+    assert "attractions" in tools_found("any good museums nearby")
+    assert "events" in tools_found("festivals this summer")
+    assert classify_message("museums in montreal") == ("attractions_inquiry", ("attractions",), "Montreal")
+
+def test_only_keyword_plurals_are_singularized():
+    assert scan_keywords("this bus takes gas and news") == frozenset()
+
+def test_extract_event_type():
+    assert extract_event_type("any concerts tonight") == "music"
+    assert extract_event_type("a hockey match") == "sports"
+    # "show me" is a request, not a show
+    assert extract_event_type("show me a hockey game") is None
+    assert extract_event_type("what is happening") is None
+
+def test_extract_interests_in_table_order():
+    assert extract_interests("food, hiking and a concert") == ["music", "food", "outdoor"]
+    assert extract_interests("just looking") == []
+
+def test_classify_message():
+    assert classify_message("what's the weather in vancouver") == ("weather_inquiry", ("weather",), "Vancouver")
+    assert classify_message("hello there") == ("general_question", (), None)
+
+def test_classify_message_later_category_sets_intent():
+    intent, tools, _ = classify_message("concerts and weather in ottawa")
+    assert tools == ("events", "weather")
+    assert intent == "weather_inquiry"
+
+def test_city_without_keywords_gets_general_lookups():
+    assert classify_message("tell me about halifax") == (
+        "general_city_inquiry", ("recommendations", "attractions"), "Halifax")
+
+def test_data_responses_skip_fallback_data():
+    attractions = [{"name": "Old Port", "description": "Historic waterfront"}]
+    assert "Old Port" in render_data_response("attractions_inquiry", "Montreal", ["attractions"],
+                                              {"attractions": attractions})
+    fallback = [{**attractions[0], "source": FALLBACK_SOURCE}]
+    assert render_data_response("attractions_inquiry", "Montreal", ["attractions"],
+                                {"attractions": fallback}) is None
+    
+    current = {"temperature": 3.0, "condition": "Snow", "humidity": 80, "wind_speed": 12.0}
+    forecast = [{"date": "2024-01-02", "high_temp": 1.0, "low_temp": -5.0, "condition": "Snow"}]
+    weather = {"current": current, "forecast": forecast}
+    assert render_data_response("weather_inquiry", "Montreal", ["weather"], {"weather": weather})
+    # A real current reading paired with fallback forecast data still goes to the LLM
+    mixed = {"current": current, "forecast": [{**forecast[0], "source": FALLBACK_SOURCE}]}
+    assert render_data_response("weather_inquiry", "Montreal", ["weather"], {"weather": mixed}) is None
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the simple travel planning graph
+"""
+
+import asyncio
+import time
+import pytest
+
+pytest.importorskip("langgraph")
+
+import graph_simple
+from graph_simple import SimpleTravelPlanningGraph, detect_intent
+
+def test_detect_intent_priority():
+    # "plan" signals both trip planning and itinerary; trip planning ranks first
+    assert detect_intent("Plan my itinerary") == "trip_planning"
+    assert detect_intent("What should I pack given the weather?") == "weather_inquiry"
+    assert detect_intent("Show me the schedule") == "itinerary_request"
+
+def test_detect_intent_longest_keyword_at_position():
+    # "packing" also contains "pack"; both signal the same intent
+    assert detect_intent("Packing list please") == "packing_request"
+    assert detect_intent("What should I bring?") == "packing_request"
+
+def test_detect_intent_default():
+    assert detect_intent("Hello!") == "general_question"
+    assert detect_intent("") == "general_question"
+
+class FakeApp:
+    """Stands in for the compiled graph, counting invocations"""
+    
+    def __init__(self, result=None, error=None, delay=0.0):
+        self.calls = 0
+        self.result = result or {"response": "Banff is lovely in winter.", "intent": "trip_planning",
+                                 "confidence": 0.9, "suggestions": []}
+        self.error = error
+        self.delay = delay
+    
+    async def ainvoke(self, state):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {**state, **self.result}
+
+def expires_in(travel_graph, message):
+    expires_at, _ = travel_graph._response_cache[graph_simple.chat_cache_key({"message": message})]
+    return expires_at - time.monotonic()
+
+@pytest.mark.asyncio
+async def test_repeated_requests_use_response_cache():
+    travel_graph = SimpleTravelPlanningGraph()
+    travel_graph.app = FakeApp()
+    
+    first = await travel_graph.run({"message": "Plan a trip to Banff", "session_id": "a"})
+    second = await travel_graph.run({"message": "Plan a trip to Banff", "session_id": "b"})
+    assert travel_graph.app.calls == 1
+    assert second["response"] == first["response"]
+    assert (first["session_id"], second["session_id"]) == ("a", "b")
+    assert expires_in(travel_graph, "Plan a trip to Banff") > graph_simple.ERROR_RESPONSE_CACHE_TTL
+
+@pytest.mark.asyncio
+async def test_failures_are_cached_briefly():
+    travel_graph = SimpleTravelPlanningGraph()
+    travel_graph.app = FakeApp(error=RuntimeError("Vertex AI unavailable"))
+    
+    first = await travel_graph.run({"message": "Plan a trip to Banff"})
+    await travel_graph.run({"message": "Plan a trip to Banff"})
+    assert travel_graph.app.calls == 1
+    assert first["confidence"] == 0.5
+    assert expires_in(travel_graph, "Plan a trip to Banff") <= graph_simple.ERROR_RESPONSE_CACHE_TTL
+
+@pytest.mark.asyncio
+async def test_low_confidence_fallback_cached_briefly():
+    travel_graph = SimpleTravelPlanningGraph()
+    travel_graph.app = FakeApp(result={"response": "Sorry", "confidence": 0.3})
+    
+    await travel_graph.run({"message": "Plan a trip to Banff"})
+    assert expires_in(travel_graph, "Plan a trip to Banff") <= graph_simple.ERROR_RESPONSE_CACHE_TTL
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_run():
+    travel_graph = SimpleTravelPlanningGraph()
+    travel_graph.app = FakeApp(delay=0.02)
+    
+    responses = await asyncio.gather(*(
+        travel_graph.run({"message": "Plan a trip to Banff", "session_id": str(i)}) for i in range(5)))
+    assert travel_graph.app.calls == 1
+    assert [response["session_id"] for response in responses] == ["0", "1", "2", "3", "4"]
+    assert travel_graph._inflight == {}
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_run():
+    travel_graph = SimpleTravelPlanningGraph()
+    travel_graph.app = FakeApp(delay=0.05)
+    
+    first = asyncio.ensure_future(travel_graph.run({"message": "Plan a trip to Banff", "session_id": "a"}))
+    second = asyncio.ensure_future(travel_graph.run({"message": "Plan a trip to Banff", "session_id": "b"}))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    
+    response = await second
+    assert response["response"] == "Banff is lovely in winter."
+    assert travel_graph.app.calls == 1
@@ -15,7 +15,7 @@ async def test_model_router():
     
     # Test 1: Default models for each agent
     print("\n1. Testing default model assignments:")
-    agents = ["explore", "itinerary", "packing", "tips", "events", "formatter", "pdf"]
+    agents = ["explore", "itinerary", "packing", "tips", "events", "formatter", "pdf", "intent"]
     
     for agent in agents:
         model = model_router.get_model_for_agent(agent)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the Phoenix evaluation adapter
+"""
+
+import atexit
+import json
+import os
+import time
+import pytest
+
+pytest.importorskip("phoenix")
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from eval import phoenix_adapter
+from eval.phoenix_adapter import PhoenixAdapter, _SummaryColumns, _score_itinerary, _score_packing
+
+def test_score_itinerary():
+    assert _score_itinerary(0, 0, 0.0) == 0.0
+    assert _score_itinerary(7, 35, 1.0) == 1.0
+    assert _score_itinerary(3, 10, 1.0) == pytest.approx((3 / 7 + 10 / 15 + 1.0) / 3)
+    assert _score_itinerary(14, 20, 1.5) == pytest.approx((1.0 + 20 / 70 + 0.5) / 3)
+
+def test_score_itinerary_skips_factors_that_do_not_apply():
+    assert _score_itinerary(2, 0, 0.0) == pytest.approx(2 / 7)
+    assert _score_itinerary(0, 0, 0.8) == pytest.approx(0.8)
+    assert _score_itinerary(7, 0, 2.0) == pytest.approx(0.5)
+
+def test_score_packing():
+    assert _score_packing(0, 0, False) == 0.0
+    assert _score_packing(0, 0, True) == 1.0
+    assert _score_packing(16, 100, False) == 1.0
+    assert _score_packing(4, 25, True) == pytest.approx((0.5 + 0.5 + 1.0) / 3)
+
+@pytest.fixture
+def utc(monkeypatch):
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def summary(timestamps, start_date=None, end_date=None):
+    columns = _SummaryColumns()
+    columns.extend((i, {"task": "exploration", "timestamp": timestamp,
+                        "metrics": {"success": True, "execution_time_seconds": 1.0}})
+                   for i, timestamp in enumerate(timestamps))
+    adapter = PhoenixAdapter.__new__(PhoenixAdapter)
+    return adapter._calculate_summary_statistics([columns], start_date=start_date, end_date=end_date)
+
+def test_summary_date_filter():
+    timestamps = ["2024-01-01T09:00:00.000001", "2024-01-02T09:00:00", "2024-01-03T09:00:00"]
+    assert summary(timestamps, "2024-01-02")["total_evaluations"] == 2
+    assert summary(timestamps, "2024-01-02", "2024-01-02T23:59:59")["total_evaluations"] == 1
+    assert summary(timestamps, end_date="2024-01-01") == {}
+
+def test_summary_date_filter_keeps_unparsed_timestamps_like_string_compare():
+    timestamps = ["", "2024-01-02T09:00:00"]
+    # "" sorts before any bound: kept by an end bound, dropped by a start bound
+    assert summary(timestamps, end_date="2024-01-03")["total_evaluations"] == 2
+    assert summary(timestamps, start_date="2024-01-01")["total_evaluations"] == 1
+
+def test_summary_date_filter_accepts_utc_offsets(utc):
+    timestamps = ["2024-01-01T23:00:00", "2024-01-02T09:00:00"]
+    assert summary(timestamps, "2024-01-02T00:00:00Z")["total_evaluations"] == 1
+    assert summary(timestamps, "2024-01-02T02:00:00+02:00")["total_evaluations"] == 1
+    assert summary(timestamps, end_date="2024-01-02T00:00:00+00:00")["total_evaluations"] == 1
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "phoenix_evaluations.jsonl")
+    monkeypatch.setattr(phoenix_adapter, "EVALUATION_LOG_FILE", path)
+    monkeypatch.setattr(phoenix_adapter, "zstandard", None)
+    return path
+
+def test_close_log_registered_once_across_rotations(log_file, monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, "register", registered.append)
+    monkeypatch.setattr(phoenix_adapter, "LOG_ROTATE_BYTES", 64)
+    adapter = PhoenixAdapter()
+    for _ in range(5):
+        adapter._write_log_record(b'{"task": "exploration", "padding": "' + b"x" * 64 + b'"}\n')
+    adapter.close_log()
+    adapter._log_executor.shutdown()
+    
+    assert registered == [adapter.close_log]
+    assert len(phoenix_adapter._archived_log_files()) == 5
+
+def test_buffered_records_flushed_after_interval(log_file, monkeypatch):
+    monkeypatch.setattr(phoenix_adapter, "LOG_FLUSH_SECONDS", 0.05)
+    adapter = PhoenixAdapter()
+    adapter._log_executor.submit(adapter._write_log_record, b'{"task": "exploration"}\n').result()
+    assert os.path.getsize(log_file) == 0
+    
+    time.sleep(0.3)
+    assert os.path.getsize(log_file) > 0
+    adapter.close_log()
+    adapter._log_executor.shutdown()
+
+def evaluation_line(task, success):
+    record = {"task": task, "timestamp": "2024-01-02T09:00:00",
+              "metrics": {"success": success, "execution_time_seconds": 1.0}, "padding": "x" * 64}
+    return (json.dumps(record) + "\n").encode()
+
+@pytest.mark.asyncio
+async def test_summary_spans_rotated_and_compressed_logs(log_file, monkeypatch):
+    monkeypatch.setattr(phoenix_adapter, "LOG_ROTATE_BYTES", 256)
+    adapter = PhoenixAdapter()
+    for i in range(10):
+        adapter._write_log_record(evaluation_line("exploration" if i % 2 else "itinerary_generation", i < 5))
+    adapter.flush_log()
+    
+    archives = phoenix_adapter._archived_log_files()
+    assert archives
+    # Compress one archive in the foreground; rotation itself ran without zstandard
+    if zstandard is not None:
+        monkeypatch.setattr(phoenix_adapter, "zstandard", zstandard)
+        phoenix_adapter._compress_log(archives[0])
+        assert phoenix_adapter._archived_log_files()[0] == archives[0] + ".zst"
+    
+    summary = await adapter.get_evaluation_summary()
+    assert summary["total_evaluations"] == 10
+    assert summary["success_rate"] == 0.5
+    assert summary["task_breakdown"] == {"exploration": 5, "itinerary_generation": 5}
+    adapter.close_log()
+    adapter._log_executor.shutdown()
+
+def test_rotation_keeps_backup_count(log_file, monkeypatch):
+    monkeypatch.setattr(phoenix_adapter, "LOG_ROTATE_BYTES", 64)
+    monkeypatch.setattr(phoenix_adapter, "LOG_BACKUP_COUNT", 2)
+    adapter = PhoenixAdapter()
+    created = []
+    for _ in range(5):
+        adapter._write_log_record(evaluation_line("exploration", True))
+        created.append(phoenix_adapter._archived_log_files()[-1])
+    
+    # Only the newest archives are kept
+    assert phoenix_adapter._archived_log_files() == created[-2:]
+    adapter.close_log()
+    adapter._log_executor.shutdown()
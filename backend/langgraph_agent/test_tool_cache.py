@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared tool result cache
+"""
+
+import asyncio
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from tools import cache
+
+@pytest.fixture(autouse=True)
+def empty_tool_cache():
+    cache._tool_cache.clear()
+    yield
+    cache._tool_cache.clear()
+
+def expires_in(key):
+    expires_at, _ = cache._tool_cache[key]
+    return expires_at - cache.time.monotonic()
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call():
+    calls = 0
+    
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [{"name": "Jazz Festival"}]
+    
+    results = await asyncio.gather(*(cache.cached_tool_call(("events", "Montreal"), call) for _ in range(10)))
+    assert calls == 1
+    assert all(result == [{"name": "Jazz Festival"}] for result in results)
+    assert cache._tool_cache_locks == {}
+    
+    await cache.cached_tool_call(("events", "Montreal"), call)
+    assert calls == 1
+
+@pytest.mark.asyncio
+async def test_fallback_and_empty_results_expire_quickly():
+    async def fallback():
+        return [{"name": "Famous Museum", "source": cache.FALLBACK_SOURCE}]
+    
+    async def empty():
+        return []
+    
+    async def real():
+        return [{"name": "Old Port"}]
+    
+    await cache.cached_tool_call(("attractions", "Montreal"), fallback)
+    await cache.cached_tool_call(("attractions", "Quebec City"), empty)
+    await cache.cached_tool_call(("attractions", "Ottawa"), real)
+    assert expires_in(("attractions", "Montreal")) <= cache.TOOL_FALLBACK_CACHE_TTL
+    assert expires_in(("attractions", "Quebec City")) <= cache.TOOL_FALLBACK_CACHE_TTL
+    assert expires_in(("attractions", "Ottawa")) > cache.TOOL_FALLBACK_CACHE_TTL
+
+@pytest.mark.asyncio
+async def test_failed_calls_are_not_cached():
+    async def failing():
+        raise RuntimeError("backend down")
+    
+    with pytest.raises(RuntimeError):
+        await cache.cached_tool_call(("events", "Toronto"), failing)
+    assert ("events", "Toronto") not in cache._tool_cache
+    assert cache._tool_cache_locks == {}
+
+def test_is_fallback_result():
+    assert cache.is_fallback_result([])
+    assert cache.is_fallback_result({})
+    assert cache.is_fallback_result([{"name": "a"}, {"name": "b", "source": cache.FALLBACK_SOURCE}])
+    assert not cache.is_fallback_result([{"name": "a", "source": "Go backend"}])
+
+@pytest.mark.asyncio
+async def test_weather_with_any_fallback_part_expires_quickly():
+    current = {"temperature": 3.0, "condition": "Snow", "source": "OpenWeather API"}
+    forecast = [{"date": "2024-01-02", "high_temp": 1.0}, {"date": "2024-01-03", "high_temp": 2.0}]
+    fallback = {"source": cache.FALLBACK_SOURCE}
+    results = {
+        "Montreal": {"current": current, "forecast": forecast},
+        # Real current reading with one fallback forecast day
+        "Ottawa": {"current": current, "forecast": [forecast[0], {**forecast[1], **fallback}]},
+        "Toronto": {"current": {**current, **fallback}, "forecast": forecast},
+        "Halifax": {"current": current, "forecast": []}
+    }
+    for city, result in results.items():
+        async def call(result=result):
+            return result
+        await cache.cached_tool_call(("weather", city), call)
+    
+    assert expires_in(("weather", "Montreal")) > cache.TOOL_FALLBACK_CACHE_TTL
+    for city in ("Ottawa", "Toronto", "Halifax"):
+        assert expires_in(("weather", city)) <= cache.TOOL_FALLBACK_CACHE_TTL
+
+@pytest.mark.asyncio
+async def test_weather_tool_fallback_forecast_is_detected(monkeypatch):
+    from tools.weather import WeatherTool
+    
+    weather_tool = WeatherTool()
+    
+    async def get_current_weather(city):
+        return {"city": city, "temperature": 3.0, "source": "OpenWeather API"}
+    
+    async def get_weather_forecast(city, days=5):
+        return weather_tool._get_fallback_forecast(city, days)
+    
+    monkeypatch.setattr(weather_tool, "get_current_weather", get_current_weather)
+    monkeypatch.setattr(weather_tool, "get_weather_forecast", get_weather_forecast)
+    assert cache.is_fallback_result(await weather_tool.get_current_and_forecast("Montreal", 3))
@@ -9,7 +9,7 @@ import json
 import logging
 import os
 from typing import Dict, List, Any, Optional
-import aiohttp
+from tools.http_session import shared_session
 
 logger = logging.getLogger(__name__)
 
@@ -73,7 +73,7 @@ class AttractionsTool:
         try:
             backend_url = os.getenv("BACKEND_URL", "http://cantrip-backend:8080")
             
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 url = f"{backend_url}/api/v1/places/suggestions"
                 params = {
                     "city": city,
@@ -136,7 +136,8 @@ class AttractionsTool:
                 "price_range": "$$",
                 "hours": "9:00 AM - 6:00 PM",
                 "website": f"https://example.com/{city_info['name'].lower()}-{attraction_name.lower().replace(' ', '-')}",
-                "tags": ["landmark", "tourist", "popular"]
+                "tags": ["landmark", "tourist", "popular"],
+                "source": "Fallback data"
             })
         
         return attractions
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Shared result cache for CanTrip tool calls
+Reuses tool results across turns and graphs, keeping fallback data only briefly
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+
+# Seconds each tool's results are reused for identical arguments across turns
+TOOL_CACHE_TTLS = {
+    "events": 3600,
+    "weather": 900,
+    "attractions": 86400,
+    "recommendations": 86400
+}
+TOOL_CACHE_SIZE = 512
+
+# Fallback and empty results mean the upstream lookup failed; keep them only briefly
+TOOL_FALLBACK_CACHE_TTL = 30
+FALLBACK_SOURCE = "Fallback data"
+
+_tool_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+# Per-key lock and number of callers holding or waiting on it
+_tool_cache_locks: Dict[tuple, list] = {}
+
+def is_fallback_result(result: Any) -> bool:
+    """Whether a tool result is empty or was served from the tool's local fallback data"""
+    if not result:
+        return True
+    if isinstance(result, dict):
+        # Weather: {"current": {...}, "forecast": [...]}; either part missing or from
+        # fallback data makes the whole result a fallback
+        current, forecast = result.get("current"), result.get("forecast")
+        if not current or not forecast:
+            return True
+        items = [current, *forecast]
+    else:
+        items = result
+    return any(isinstance(item, dict) and item.get("source") == FALLBACK_SOURCE for item in items)
+
+def _cached_tool_result(key: tuple) -> Any:
+    """Unexpired cached result for a tool call key, or None"""
+    entry = _tool_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, result = entry
+    if expires_at < time.monotonic():
+        del _tool_cache[key]
+        return None
+    _tool_cache.move_to_end(key)
+    return result
+
+async def cached_tool_call(key: tuple, call: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a tool call keyed by (tool, *args), reusing its result until the tool's TTL expires"""
+    result = _cached_tool_result(key)
+    if result is not None:
+        return result
+    
+    # Concurrent misses on the same key wait for a single upstream call; the lock is
+    # dropped only once no caller holds or waits on it
+    entry = _tool_cache_locks.get(key)
+    if entry is None:
+        entry = _tool_cache_locks[key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            result = _cached_tool_result(key)
+            if result is None:
+                result = await call()
+                ttl = TOOL_FALLBACK_CACHE_TTL if is_fallback_result(result) else TOOL_CACHE_TTLS[key[0]]
+                _tool_cache[key] = (time.monotonic() + ttl, result)
+                _tool_cache.move_to_end(key)
+                while len(_tool_cache) > TOOL_CACHE_SIZE:
+                    _tool_cache.popitem(last=False)
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _tool_cache_locks[key]
+    return result
@@ -10,7 +10,7 @@ import logging
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-import aiohttp
+from tools.http_session import shared_session
 
 logger = logging.getLogger(__name__)
 
@@ -154,7 +154,7 @@ class EventsTool:
                 return api_events
             
             # Fallback to sample data if no API events available
-            city_events = self.sample_events.get(city.lower(), [])
+            city_events = [{**event, "source": "Fallback data"} for event in self.sample_events.get(city.lower(), [])]
             
             # Filter by date if provided
             if date:
@@ -226,7 +226,7 @@ class EventsTool:
             # Call the Go backend events API
             backend_url = os.getenv("BACKEND_URL", "http://cantrip-backend:8080")
             
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 url = f"{backend_url}/api/v1/places/events"
                 params = {"city": city}
                 
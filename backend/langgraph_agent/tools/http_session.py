@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP session for CanTrip tools
+Reuses one aiohttp connection pool per event loop instead of a session per call
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Connection pool size and DNS cache lifetime for backend calls
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_DNS_CACHE_TTL = 300
+
+# One session per event loop; sessions cannot be shared across loops
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+def get_session() -> aiohttp.ClientSession:
+    """Shared session for the running event loop, created on first use"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=HTTP_POOL_LIMIT, ttl_dns_cache=HTTP_DNS_CACHE_TTL)
+        session = aiohttp.ClientSession(connector=connector)
+        _sessions[loop] = session
+    return session
+
+@asynccontextmanager
+async def shared_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """Drop-in for `async with aiohttp.ClientSession()` that keeps the pool open"""
+    yield get_session()
+
+async def close_session():
+    """Close the running loop's shared session (call on shutdown)"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+        logger.info("Closed shared HTTP session")
@@ -9,7 +9,7 @@ import json
 import logging
 import os
 from typing import Dict, List, Any, Optional
-import aiohttp
+from tools.http_session import shared_session
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +74,10 @@ class RecommendationTool:
             seasonal = self._get_seasonal_recommendations(city_info)
             recommendations.extend(seasonal)
             
+            # Mark metadata-only results so callers don't cache them like backend data
+            if not backend_recommendations:
+                recommendations = [{**item, "source": "Fallback data"} for item in recommendations]
+            
             return recommendations[:20]  # Limit to 20 recommendations
             
         except Exception as e:
@@ -85,7 +89,7 @@ class RecommendationTool:
         try:
             backend_url = os.getenv("BACKEND_URL", "http://cantrip-backend:8080")
             
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 url = f"{backend_url}/api/v1/places/suggestions"
                 params = {
                     "city": city,
@@ -10,7 +10,7 @@ import logging
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-import aiohttp
+from tools.http_session import shared_session
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +32,7 @@ class WeatherTool:
         
         try:
             # Call the Go backend weather service
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 url = f"{self.backend_url}/api/v1/weather/current"
                 params = {"city": city}
                 
@@ -63,7 +63,7 @@ class WeatherTool:
         
         try:
             # Call the Go backend weather forecast service
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 url = f"{self.backend_url}/api/v1/weather/forecast"
                 params = {"city": city, "days": str(days)}
                 
@@ -93,13 +93,24 @@ class WeatherTool:
             logger.error(f"Error getting weather forecast: {e}")
             return self._get_fallback_forecast(city, days)
     
+    async def get_current_and_forecast(self, city: str, days: int = 5) -> Dict[str, Any]:
+        """Get current weather and forecast for a city with both requests in flight together"""
+        current, forecast = await asyncio.gather(
+            self.get_current_weather(city),
+            self.get_weather_forecast(city, days)
+        )
+        return {
+            "current": current,
+            "forecast": forecast
+        }
+    
     async def get_weather_with_notes(self, city: str) -> Dict[str, Any]:
         """Get weather with travel notes and recommendations"""
         logger.info(f"Getting weather with travel notes for {city}")
         
         try:
             # Call the Go backend weather with notes service
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 url = f"{self.backend_url}/api/v1/weather/forecast/with-notes"
                 params = {"city": city}
                 
@@ -150,7 +161,8 @@ class WeatherTool:
                 "condition": "Partly Cloudy",
                 "humidity": 60,
                 "wind_speed": 10.0,
-                "precipitation": 0.0
+                "precipitation": 0.0,
+                "source": "Fallback data"
             })
         
         return forecasts
@@ -258,7 +258,6 @@ func callLangGraphAgentStream(message string, session *ConversationSession, c *g
 			chunkJSON, _ := json.Marshal(chunk)
 			fmt.Fprintf(c.Writer, "data: %s\n\n", chunkJSON)
 			c.Writer.Flush()
-			time.Sleep(50 * time.Millisecond)
 		}
 
 		// Send done signal